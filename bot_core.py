@@ -0,0 +1,2895 @@
+import os
+import queue
+import hashlib
+import hmac
+import importlib
+import json
+import random
+import re
+import secrets
+import signal
+import sys
+import shutil
+import socket
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from collections import deque
+from typing import NamedTuple
+
+from PySide6.QtCore import (
+    QCoreApplication,
+    QFileSystemWatcher,
+    QObject,
+    QProcess,
+    QProcessEnvironment,
+    QThread,
+    QTimer,
+    Signal,
+)
+
+
+STATE_STOPPED = "stopped"
+STATE_STARTING = "starting"
+STATE_RUNNING = "running"
+STATE_STOPPING = "stopping"
+STATE_CRASHED = "crashed"
+STATE_BACKOFF = "backoff"
+STATE_PARKED = "parked"
+STATE_PREPARING = "preparing"
+
+BOT_DATA_FILE = "bot_manager_data.json"
+TEMP_EXTRACT_DIR = "bot_temp"
+SETTINGS_FILE = "settings.json"
+BOT_META_DIR = ".botmanager"
+
+STATE_ICONS = {
+    STATE_STOPPED: "⚪",
+    STATE_STARTING: "🟡",
+    STATE_RUNNING: "🟢",
+    STATE_STOPPING: "🟠",
+    STATE_CRASHED: "🔴",
+    STATE_BACKOFF: "⏳",
+    STATE_PARKED: "⛔",
+    STATE_PREPARING: "📦",
+}
+
+
+_OPTIONAL_MODULES: dict[str, object] = {}
+IMPORT_TIMINGS: dict[str, float] = {}
+
+
+def optional_import(name: str):
+    # Optional subsystems (psutil, GPUtil, requests, dotenv) are only
+    # imported on first use; a missing package is cached as None.
+    if name not in _OPTIONAL_MODULES:
+        t0 = time.perf_counter()
+        try:
+            _OPTIONAL_MODULES[name] = importlib.import_module(name)
+        except Exception:
+            _OPTIONAL_MODULES[name] = None
+        IMPORT_TIMINGS[name] = time.perf_counter() - t0
+    return _OPTIONAL_MODULES[name]
+
+
+def user_cache_dir() -> str:
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "DiscordBotManager")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "discord-bot-manager")
+
+
+def read_env_file(path: str) -> dict[str, str]:
+    dotenv = optional_import("dotenv")
+    if dotenv is not None:
+        return {k: v for k, v in dotenv.dotenv_values(path).items() if v is not None}
+    values = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            k, v = line.split("=", 1)
+            k = k.strip()
+            if k.startswith("export "):
+                k = k[7:].strip()
+            v = v.strip()
+            if len(v) >= 2 and v[0] == v[-1] and v[0] in "'\"":
+                v = v[1:-1]
+            values[k] = v
+    return values
+
+
+DEFAULT_SETTINGS = {
+    "auto_restart": False,
+    "auto_start_app": False,
+    "auto_start_bots": False,
+    "notifications": True,
+    "cleanup_temp_on_close": False,
+    "shutdown_grace_seconds": 5,
+    "metrics_enabled": False,
+    "metrics_port": 9464,
+    "control_api_enabled": True,
+    "control_port": 0,
+    "env_vars": {},
+    "start_with_windows": False,
+    "theme": "dark",
+}
+
+
+def atomic_write_text(path: str, text: str):
+    # Write to a temp file in the same directory, then rename over the
+    # target, so a crash mid-write never leaves a truncated file behind.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _read_json(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except Exception:
+        # Keep the unreadable file for inspection instead of silently
+        # overwriting it with defaults on the next save.
+        try:
+            os.replace(path, path + ".corrupt")
+        except OSError:
+            pass
+        return None
+
+
+def load_settings():
+    settings = json.loads(json.dumps(DEFAULT_SETTINGS))
+    settings.update(_read_json(SETTINGS_FILE) or {})
+    return settings
+
+
+def load_bot_files() -> list[str]:
+    return list((_read_json(BOT_DATA_FILE) or {}).get("bot_files", []))
+
+
+SETTINGS = load_settings()
+
+
+class StateStore(QObject):
+    # Single in-memory copy of settings.json and bot_manager_data.json.
+    # Changes are announced via changed("settings" | "bots") and written
+    # atomically on a background thread after a short debounce.
+    changed = Signal(str)
+    write_failed = Signal(str, str)
+
+    def __init__(self, settings: dict, parent=None, debounce_ms: int = 400):
+        super().__init__(parent)
+        self.settings = settings
+        self._bot_files = load_bot_files()
+        self._dirty: set[str] = set()
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._write_dirty)
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def bot_files(self) -> list[str]:
+        return list(self._bot_files)
+
+    def set_bot_files(self, paths: list[str]):
+        paths = list(paths)
+        if paths == self._bot_files:
+            return
+        self._bot_files = paths
+        self._schedule("bots")
+
+    def commit_settings(self):
+        self._schedule("settings")
+
+    def _schedule(self, name: str):
+        self._dirty.add(name)
+        self._debounce.start()
+        self.changed.emit(name)
+
+    def _payload(self, name: str) -> tuple[str, str]:
+        if name == "settings":
+            return SETTINGS_FILE, json.dumps(self.settings, indent=4)
+        return BOT_DATA_FILE, json.dumps({"bot_files": self._bot_files}, indent=4)
+
+    def _write_dirty(self):
+        dirty, self._dirty = self._dirty, set()
+        for name in sorted(dirty):
+            self._queue.put(self._payload(name))
+
+    def _write_loop(self):
+        while True:
+            path, text = self._queue.get()
+            try:
+                atomic_write_text(path, text)
+            except Exception as e:
+                self.write_failed.emit(path, str(e))
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        self._debounce.stop()
+        self._write_dirty()
+        self._queue.join()
+
+
+_STATE_STORE: StateStore | None = None
+
+
+def state_store() -> StateStore:
+    global _STATE_STORE
+    if _STATE_STORE is None:
+        _STATE_STORE = StateStore(SETTINGS)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_STATE_STORE.flush)
+    return _STATE_STORE
+
+
+def save_settings(settings: dict | None = None):
+    if settings is not None and settings is not SETTINGS:
+        SETTINGS.update(settings)
+    state_store().commit_settings()
+
+
+def bot_folder(path: str) -> str:
+    return path if os.path.isdir(path) else os.path.dirname(path)
+
+
+def bot_name(path: str) -> str:
+    return os.path.basename(os.path.normpath(bot_folder(path))) or path
+
+
+def python_executable() -> str:
+    if getattr(sys, "frozen", False):
+        py = shutil.which("python") or shutil.which("python3")
+        if not py:
+            raise RuntimeError("Python nicht gefunden. Bots können nicht gestartet werden.")
+        return py
+    return sys.executable
+
+
+WELL_KNOWN_ENTRIES = ("main.py", "bot.py", "__main__.py")
+_BOT_USAGE = re.compile(
+    r"\b(?:discord\.(?:Bot|AutoShardedBot|Client|AutoShardedClient)"
+    r"|commands\.(?:Bot|AutoShardedBot)|bridge\.Bot)\s*\("
+)
+
+
+class BotManifest:
+    # Per-bot launch description, cached in <folder>/.botmanager/manifest.json.
+    def __init__(self, folder: str, data: dict | None = None):
+        self.folder = folder
+        data = data or {}
+        self.entry: str | None = data.get("entry")
+        self.resolved_by: str | None = data.get("resolved_by")
+        self.args: list[str] = list(data.get("args", []))
+        self.env: dict[str, str] = dict(data.get("env", {}))
+        self.interpreter: str | None = data.get("interpreter")
+        self.limits: dict = dict(data.get("limits", {}))
+        self._extra = {k: v for k, v in data.items()
+                       if k not in ("entry", "resolved_by", "args", "env", "interpreter", "limits")}
+
+    @staticmethod
+    def path_for(folder: str) -> str:
+        return os.path.join(folder, BOT_META_DIR, "manifest.json")
+
+    @classmethod
+    def load(cls, folder: str) -> "BotManifest":
+        try:
+            with open(cls.path_for(folder), "r", encoding="utf-8") as f:
+                return cls(folder, json.load(f))
+        except Exception:
+            return cls(folder)
+
+    def to_dict(self) -> dict:
+        data = dict(self._extra)
+        data.update({
+            "entry": self.entry,
+            "resolved_by": self.resolved_by,
+            "args": self.args,
+            "env": self.env,
+            "interpreter": self.interpreter,
+        })
+        if self.limits:
+            data["limits"] = self.limits
+        return data
+
+    def save(self) -> bool:
+        path = self.path_for(self.folder)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write_text(path, json.dumps(self.to_dict(), indent=4))
+        except OSError:
+            return False
+        return True
+
+    def entry_path(self) -> str | None:
+        if not self.entry:
+            return None
+        p = self.entry if os.path.isabs(self.entry) else os.path.join(self.folder, self.entry)
+        return p if os.path.isfile(p) else None
+
+
+def _scan_for_bot(folder: str, py_files: list[str]) -> str | None:
+    for name in py_files:
+        try:
+            with open(os.path.join(folder, name), "r", encoding="utf-8", errors="ignore") as f:
+                if _BOT_USAGE.search(f.read(65536)):
+                    return name
+        except OSError:
+            continue
+    return None
+
+
+def resolve_entry_point(path: str, manifest: BotManifest) -> str:
+    # Explicit file > cached manifest entry > well-known names > source scan
+    # for a Bot/Client constructor > first .py file by name.
+    folder = manifest.folder
+    if os.path.isfile(path) and path.endswith(".py"):
+        entry, how = os.path.relpath(path, folder), "explicit"
+    else:
+        cached = manifest.entry_path()
+        if cached:
+            return cached
+        py_files = sorted(f for f in os.listdir(folder) if f.endswith(".py"))
+        if not py_files:
+            raise RuntimeError("No Python (.py) file found in the folder!")
+        entry = next((n for n in WELL_KNOWN_ENTRIES if n in py_files), None)
+        how = "well-known"
+        if entry is None:
+            entry, how = _scan_for_bot(folder, py_files), "scan"
+        if entry is None:
+            entry, how = py_files[0], "fallback"
+    if manifest.entry != entry or manifest.resolved_by != how:
+        manifest.entry, manifest.resolved_by = entry, how
+        manifest.save()
+    return os.path.join(folder, entry)
+
+
+class LogLine(NamedTuple):
+    timestamp: float
+    stream: str
+    text: str
+
+    @property
+    def is_error(self) -> bool:
+        return self.stream == "E"
+
+
+class BotLogStore:
+    # Each segment is a plain-text log plus a fixed-width (timestamp, offset)
+    # index, so tails and time ranges can seek instead of scanning.
+    _IDX = struct.Struct("<dQ")
+
+    def __init__(self, folder: str, max_bytes: int = 4 * 1024 * 1024, segments: int = 8):
+        self.dir = os.path.join(folder, BOT_META_DIR, "logs")
+        self.max_bytes = max_bytes
+        self.segments = segments
+        self._data = None
+        self._idx = None
+        self._size = 0
+        self._last_ts = 0.0
+
+    def _paths(self, n: int) -> tuple[str, str]:
+        stem = "console" if n == 0 else f"console.{n}"
+        return os.path.join(self.dir, stem + ".log"), os.path.join(self.dir, stem + ".idx")
+
+    def _open(self):
+        if self._data is not None:
+            return
+        os.makedirs(self.dir, exist_ok=True)
+        data_path, idx_path = self._paths(0)
+        self._data = open(data_path, "ab")
+        self._idx = open(idx_path, "ab")
+        self._size = self._data.tell()
+
+    def append(self, lines: list[str], stream: str = "O", ts: float | None = None):
+        if not lines:
+            return
+        try:
+            self._open()
+            ts = time.time() if ts is None else ts
+            # Index timestamps strictly increase between batches, so a
+            # timestamp is a usable cursor for "lines after this one".
+            if ts <= self._last_ts:
+                ts = self._last_ts + 1e-6
+            self._last_ts = ts
+            for line in lines:
+                rec = f"{ts:.3f}\t{stream}\t{line}\n".encode("utf-8", errors="replace")
+                self._idx.write(self._IDX.pack(ts, self._size))
+                self._data.write(rec)
+                self._size += len(rec)
+            if self._size >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            self.close()
+
+    def flush(self):
+        if self._data is not None:
+            try:
+                self._data.flush()
+                self._idx.flush()
+            except OSError:
+                pass
+
+    def close(self):
+        for f in (self._data, self._idx):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self._data = self._idx = None
+
+    def _rotate(self):
+        self.close()
+        for path in self._paths(self.segments - 1):
+            if os.path.exists(path):
+                os.remove(path)
+        for n in range(self.segments - 2, -1, -1):
+            for src, dst in zip(self._paths(n), self._paths(n + 1)):
+                if os.path.exists(src):
+                    os.replace(src, dst)
+        self._open()
+
+    def _existing_segments(self) -> list[int]:
+        # Newest first.
+        return [n for n in range(self.segments) if os.path.exists(self._paths(n)[1])]
+
+    def _read_entries(self, n: int, first: int, last: int) -> list[LogLine]:
+        # Timestamps come from the index at full precision (the text copy is
+        # rounded to milliseconds); records are cut at the indexed offsets.
+        data_path, idx_path = self._paths(n)
+        if last <= first:
+            return []
+        size = self._IDX.size
+        with open(idx_path, "rb") as fi:
+            fi.seek(first * size)
+            buf = fi.read((last - first + 1) * size)
+        entries = [self._IDX.unpack_from(buf, i * size) for i in range(len(buf) // size)]
+        if not entries:
+            return []
+        end = entries[last - first][1] if len(entries) > last - first else None
+        entries = entries[: last - first]
+        start = entries[0][1]
+        with open(data_path, "rb") as fd:
+            fd.seek(start)
+            raw = fd.read() if end is None else fd.read(end - start)
+        out = []
+        for i, (ts, offset) in enumerate(entries):
+            stop = entries[i + 1][1] if i + 1 < len(entries) else (end if end is not None else start + len(raw))
+            rec = raw[offset - start:stop - start].decode("utf-8", errors="replace").rstrip("\n")
+            parts = rec.split("\t", 2)
+            if len(parts) == 3:
+                out.append(LogLine(ts, parts[1], parts[2]))
+        return out
+
+    def _count(self, n: int) -> int:
+        try:
+            return os.path.getsize(self._paths(n)[1]) // self._IDX.size
+        except OSError:
+            return 0
+
+    def _bisect(self, n: int, ts: float) -> int:
+        lo, hi = 0, self._count(n)
+        with open(self._paths(n)[1], "rb") as fi:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                fi.seek(mid * self._IDX.size)
+                if self._IDX.unpack(fi.read(self._IDX.size))[0] < ts:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        return lo
+
+    def tail(self, n: int = 500) -> list[LogLine]:
+        self.flush()
+        out: list[LogLine] = []
+        for seg in self._existing_segments():
+            if n <= 0:
+                break
+            count = self._count(seg)
+            take = min(n, count)
+            try:
+                out = self._read_entries(seg, count - take, count) + out
+            except OSError:
+                break
+            n -= take
+        return out
+
+    def range(self, since: float | None = None, until: float | None = None, limit: int = 5000) -> list[LogLine]:
+        self.flush()
+        out: list[LogLine] = []
+        for seg in reversed(self._existing_segments()):
+            try:
+                count = self._count(seg)
+                first = self._bisect(seg, since) if since is not None else 0
+                last = self._bisect(seg, until) if until is not None else count
+                out.extend(self._read_entries(seg, first, min(last, first + limit - len(out))))
+            except OSError:
+                continue
+            if len(out) >= limit:
+                break
+        return out
+
+    def search(self, text: str, limit: int = 500, since: float | None = None, until: float | None = None) -> list[LogLine]:
+        self.flush()
+        needle = text.lower()
+        found: list[LogLine] = []
+        for seg in self._existing_segments():
+            try:
+                count = self._count(seg)
+                first = self._bisect(seg, since) if since is not None else 0
+                last = self._bisect(seg, until) if until is not None else count
+                lines = self._read_entries(seg, first, last)
+            except OSError:
+                continue
+            for line in reversed(lines):
+                if needle in line.text.lower():
+                    found.append(line)
+                    if len(found) >= limit:
+                        return list(reversed(found))
+        return list(reversed(found))
+
+
+class RestartPolicy:
+    def __init__(self, base_delay: float = 2.0, max_delay: float = 300.0, jitter: float = 0.25,
+                 max_restarts: int = 5, window: float = 600.0, stable_after: float = 120.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_restarts = max_restarts
+        self.window = window
+        self.stable_after = stable_after
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "RestartPolicy":
+        return cls(
+            base_delay=float(settings.get("restart_base_delay", 2.0)),
+            max_delay=float(settings.get("restart_max_delay", 300.0)),
+            max_restarts=int(settings.get("restart_max_per_window", 5)),
+            window=float(settings.get("restart_window_seconds", 600.0)),
+        )
+
+    def next_delay(self, handle: "BotProcess", now: float | None = None) -> float | None:
+        # Returns the backoff before the next attempt, or None once the bot
+        # has crashed more than max_restarts times inside the window.
+        now = time.time() if now is None else now
+        if handle.started_at is not None and now - handle.started_at >= self.stable_after:
+            handle.backoff_level = 0
+        handle.crash_times.append(now)
+        while handle.crash_times and now - handle.crash_times[0] > self.window:
+            handle.crash_times.popleft()
+        if len(handle.crash_times) > self.max_restarts:
+            return None
+        delay = min(self.max_delay, self.base_delay * (2 ** handle.backoff_level))
+        handle.backoff_level += 1
+        return delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+
+class BotFolderIndex(QObject):
+    # Caches the parsed .env and requirements.txt lookup per bot folder and
+    # invalidates them from QFileSystemWatcher events. changed() is emitted
+    # (debounced) with kind "env", "requirements", "source" or "folder".
+    changed = Signal(str, str)
+
+    def __init__(self, parent=None, debounce_ms: int = 300):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_dir_changed)
+        self._folders: dict[str, dict] = {}
+        self._pending: dict[str, set[str]] = {}
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._emit_pending)
+
+    @staticmethod
+    def key(path: str) -> str:
+        return os.path.normpath(os.path.abspath(bot_folder(path)))
+
+    def _entry(self, folder: str) -> dict:
+        entry = self._folders.get(folder)
+        if entry is None:
+            entry = self._folders[folder] = {"env": None, "requirements": None, "scripts": set()}
+        return entry
+
+    def _sync_watches(self, folder: str):
+        entry = self._folders.get(folder)
+        if entry is None:
+            return
+        wanted = [folder, os.path.join(folder, ".env"), os.path.join(folder, "requirements.txt"), *entry["scripts"]]
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        missing = [p for p in wanted if p not in watched and os.path.exists(p)]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def watch(self, path: str, script: str | None = None, folder: str | None = None):
+        folder = folder or self.key(path)
+        entry = self._entry(folder)
+        if script:
+            entry["scripts"].add(os.path.normpath(os.path.abspath(script)))
+        self._sync_watches(folder)
+
+    def unwatch(self, path: str, folder: str | None = None):
+        folder = folder or self.key(path)
+        entry = self._folders.pop(folder, None)
+        if entry is None:
+            return
+        paths = [folder, os.path.join(folder, ".env"), os.path.join(folder, "requirements.txt"), *entry["scripts"]]
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        paths = [p for p in paths if p in watched]
+        if paths:
+            self._watcher.removePaths(paths)
+
+    def env(self, path: str) -> dict[str, str]:
+        entry = self._entry(self.key(path))
+        if entry["env"] is None:
+            env_path = os.path.join(self.key(path), ".env")
+            try:
+                entry["env"] = read_env_file(env_path) if os.path.exists(env_path) else {}
+            except Exception:
+                entry["env"] = {}
+        return entry["env"]
+
+    def token(self, path: str) -> str | None:
+        env = self.env(path)
+        return env.get("DISCORD_TOKEN") or env.get("TOKEN")
+
+    def requirements_path(self, path: str) -> str | None:
+        entry = self._entry(self.key(path))
+        if entry["requirements"] is None:
+            req = os.path.join(self.key(path), "requirements.txt")
+            entry["requirements"] = req if os.path.exists(req) else ""
+        return entry["requirements"] or None
+
+    def _queue(self, folder: str, kind: str):
+        self._pending.setdefault(folder, set()).add(kind)
+        self._debounce.start()
+
+    def _on_file_changed(self, path: str):
+        folder = os.path.dirname(path)
+        entry = self._folders.get(folder)
+        if entry is None:
+            return
+        name = os.path.basename(path)
+        if name == ".env":
+            entry["env"] = None
+            kind = "env"
+        elif name == "requirements.txt":
+            entry["requirements"] = None
+            kind = "requirements"
+        else:
+            kind = "source"
+        # Editors that save via rename drop the watch; pick the file up again.
+        self._sync_watches(folder)
+        self._queue(folder, kind)
+
+    def _on_dir_changed(self, folder: str):
+        entry = self._folders.get(folder)
+        if entry is None:
+            return
+        env_present = os.path.exists(os.path.join(folder, ".env"))
+        if entry["env"] is not None and (entry["env"] != {}) != env_present:
+            entry["env"] = None
+            self._queue(folder, "env")
+        entry["requirements"] = None
+        self._sync_watches(folder)
+        self._queue(folder, "folder")
+
+    def _emit_pending(self):
+        pending, self._pending = self._pending, {}
+        for folder, kinds in pending.items():
+            for kind in sorted(kinds):
+                self.changed.emit(folder, kind)
+
+
+def requirements_key(req_path: str, base_python: str) -> str:
+    # Bots whose requirements normalise to the same set share one venv.
+    with open(req_path, "r", encoding="utf-8", errors="ignore") as f:
+        reqs = sorted({
+            line.split("#", 1)[0].strip().lower().replace(" ", "")
+            for line in f
+            if line.split("#", 1)[0].strip()
+        })
+    digest = hashlib.sha256()
+    digest.update(os.path.normcase(os.path.abspath(base_python)).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update("\n".join(reqs).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def venv_python(venv_dir: str) -> str:
+    if os.name == "nt":
+        return os.path.join(venv_dir, "Scripts", "python.exe")
+    return os.path.join(venv_dir, "bin", "python")
+
+
+def count_requirements(*req_paths: str) -> int:
+    names = set()
+    for req in req_paths:
+        try:
+            with open(req, "r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    line = line.split("#", 1)[0].strip()
+                    if line and not line.startswith("-"):
+                        names.add(line.lower())
+        except OSError:
+            continue
+    return max(1, len(names))
+
+
+class InstallStep:
+    # on_success/on_failure: "next", "done" or "abort".
+    def __init__(self, program: str, args: list[str], on_success: str = "next", on_failure: str = "abort"):
+        self.program = program
+        self.args = args
+        self.on_success = on_success
+        self.on_failure = on_failure
+
+
+class InstallJob:
+    def __init__(self, key: str, title: str, steps: list[InstallStep], total: int = 1, after: list[str] | None = None):
+        self.key = key
+        self.title = title
+        self.steps = steps
+        self.total = total
+        self.after = list(after or [])
+        self.state = "queued"
+        self.step = 0
+        self.seen = 0
+        self.proc: QProcess | None = None
+
+    def progress(self) -> int:
+        if self.state == "done":
+            return 100
+        frac = min(1.0, self.seen / max(1, self.total))
+        return int(100 * (self.step + frac) / max(1, len(self.steps)))
+
+
+class InstallQueue(QObject):
+    # Bounded pool of pip/venv jobs. Jobs are keyed by what they install, so
+    # submitting an identical requirement set again joins the existing job.
+    job_added = Signal(str, str)
+    job_progress = Signal(str, int)
+    job_output = Signal(str, list)
+    job_finished = Signal(str, bool, str)
+
+    _PROGRESS_PREFIXES = ("Collecting ", "Requirement already satisfied", "Saved ", "Processing ", "Using cached ")
+
+    def __init__(self, parent=None, workers: int = 2):
+        super().__init__(parent)
+        self.workers = max(1, workers)
+        self._jobs: dict[str, InstallJob] = {}
+        self._order: deque[str] = deque()
+
+    def jobs(self) -> list[InstallJob]:
+        return list(self._jobs.values())
+
+    def job(self, key: str) -> InstallJob | None:
+        return self._jobs.get(key)
+
+    def submit(self, key: str, title: str, steps: list[InstallStep], total: int = 1,
+               after: list[str] | None = None) -> InstallJob:
+        job = self._jobs.get(key)
+        if job is not None:
+            return job
+        job = self._jobs[key] = InstallJob(key, title, steps, total, after)
+        self._order.append(key)
+        self.job_added.emit(key, title)
+        QTimer.singleShot(0, self._pump)
+        return job
+
+    def cancel(self, key: str):
+        job = self._jobs.get(key)
+        if job is None:
+            return
+        job.state = "cancelled"
+        if job.proc is not None:
+            job.proc.kill()
+        else:
+            self._complete(job, False, "Cancelled.")
+
+    def cancel_all(self):
+        for key in list(self._jobs):
+            self.cancel(key)
+
+    def _running(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.state == "running")
+
+    def _pump(self):
+        for key in list(self._order):
+            if self._running() >= self.workers:
+                return
+            job = self._jobs.get(key)
+            if job is None or job.state != "queued":
+                continue
+            if any(dep in self._jobs for dep in job.after):
+                continue
+            self._order.remove(key)
+            job.state = "running"
+            self._run_step(job)
+
+    def _run_step(self, job: InstallJob):
+        step = job.steps[job.step]
+        job.seen = 0
+        proc = QProcess(self)
+        proc.setProgram(step.program)
+        proc.setArguments(step.args)
+        proc.setProcessChannelMode(QProcess.MergedChannels)
+        proc.readyReadStandardOutput.connect(lambda j=job, p=proc: self._read(j, p))
+        proc.finished.connect(lambda code, status, j=job, p=proc: self._step_finished(j, p, code))
+        proc.errorOccurred.connect(lambda err, j=job, p=proc: self._step_error(j, p, err))
+        job.proc = proc
+        self.job_output.emit(job.key, [f"$ {os.path.basename(step.program)} {' '.join(step.args)}"])
+        self.job_progress.emit(job.key, job.progress())
+        proc.start()
+
+    def _read(self, job: InstallJob, proc: QProcess):
+        text = bytes(proc.readAllStandardOutput()).decode(errors="ignore")
+        lines = [l for l in text.splitlines() if l.strip()]
+        if not lines:
+            return
+        bumped = sum(1 for l in lines if l.lstrip().startswith(self._PROGRESS_PREFIXES))
+        if bumped:
+            job.seen += bumped
+            self.job_progress.emit(job.key, job.progress())
+        self.job_output.emit(job.key, lines)
+
+    def _step_error(self, job: InstallJob, proc: QProcess, err):
+        if err == QProcess.FailedToStart and job.proc is proc:
+            job.proc = None
+            proc.deleteLater()
+            self._complete(job, False, f"{job.steps[job.step].program}: could not start")
+
+    def _step_finished(self, job: InstallJob, proc: QProcess, code: int):
+        if job.proc is not proc:
+            return
+        job.proc = None
+        proc.deleteLater()
+        if job.state == "cancelled":
+            self._complete(job, False, "Cancelled.")
+            return
+        step = job.steps[job.step]
+        action = step.on_success if code == 0 else step.on_failure
+        if action == "next" and job.step + 1 < len(job.steps):
+            job.step += 1
+            self._run_step(job)
+        elif action == "abort":
+            self._complete(job, False, f"{os.path.basename(step.program)} {' '.join(step.args[:3])} failed (code {code}).")
+        else:
+            self._complete(job, code == 0 or action == "done", "" if code == 0 else f"failed (code {code}).")
+
+    def _complete(self, job: InstallJob, ok: bool, msg: str):
+        if self._jobs.get(job.key) is not job:
+            return
+        job.state = "done" if ok else ("cancelled" if job.state == "cancelled" else "failed")
+        del self._jobs[job.key]
+        if job.key in self._order:
+            self._order.remove(job.key)
+        self.job_progress.emit(job.key, 100 if ok else job.progress())
+        self.job_finished.emit(job.key, ok, msg)
+        self._pump()
+
+
+class VenvManager(QObject):
+    # Creates one venv per distinct requirements set under the user cache
+    # and installs from a shared local wheelhouse: an offline install is
+    # tried first, and only on a miss are wheels built/downloaded into it.
+    ready = Signal(str, str)
+    failed = Signal(str, str)
+    output = Signal(str, list)
+
+    READY_MARKER = ".botmanager-ready"
+
+    def __init__(self, installs: InstallQueue, parent=None, root: str | None = None):
+        super().__init__(parent)
+        self.installs = installs
+        self.root = root or os.path.join(user_cache_dir(), "venvs")
+        self.wheelhouse = os.path.join(user_cache_dir(), "wheelhouse")
+        installs.job_output.connect(self._on_job_output)
+        installs.job_finished.connect(self._on_job_finished)
+
+    @staticmethod
+    def job_key(key: str) -> str:
+        return "venv:" + key
+
+    def key_for(self, req_path: str) -> str:
+        return requirements_key(req_path, python_executable())
+
+    def venv_dir(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def python_for(self, req_path: str) -> str | None:
+        key = self.key_for(req_path)
+        if os.path.exists(os.path.join(self.venv_dir(key), self.READY_MARKER)):
+            return venv_python(self.venv_dir(key))
+        return None
+
+    def is_busy(self, key: str) -> bool:
+        return self.installs.job(self.job_key(key)) is not None
+
+    def _pip(self, key: str, *args: str) -> tuple[str, list[str]]:
+        return venv_python(self.venv_dir(key)), ["-m", "pip", "--disable-pip-version-check", *args]
+
+    def ensure(self, req_path: str, force: bool = False, after: list[str] | None = None) -> str:
+        key = self.key_for(req_path)
+        if self.is_busy(key):
+            return key
+        marker = os.path.join(self.venv_dir(key), self.READY_MARKER)
+        if os.path.exists(marker) and not force:
+            self.ready.emit(key, venv_python(self.venv_dir(key)))
+            return key
+        if os.path.exists(marker):
+            os.remove(marker)
+        os.makedirs(self.wheelhouse, exist_ok=True)
+        steps = []
+        if not os.path.exists(venv_python(self.venv_dir(key))):
+            steps.append(InstallStep(python_executable(), ["-m", "venv", self.venv_dir(key)]))
+        offline = self._pip(key, "install", "--no-index", "--find-links", self.wheelhouse, "-r", req_path)
+        steps.append(InstallStep(*offline, on_success="done", on_failure="next"))
+        steps.append(InstallStep(*self._pip(key, "wheel", "--find-links", self.wheelhouse, "-w", self.wheelhouse, "-r", req_path)))
+        steps.append(InstallStep(*offline))
+        self.installs.submit(self.job_key(key), f"venv {key} ({os.path.basename(os.path.dirname(req_path))})",
+                             steps, total=count_requirements(req_path), after=after)
+        return key
+
+    def _on_job_output(self, job_key: str, lines: list):
+        if job_key.startswith("venv:"):
+            self.output.emit(job_key[5:], lines)
+
+    def _on_job_finished(self, job_key: str, ok: bool, msg: str):
+        if not job_key.startswith("venv:"):
+            return
+        key = job_key[5:]
+        if not ok:
+            self.failed.emit(key, msg)
+            return
+        try:
+            with open(os.path.join(self.venv_dir(key), self.READY_MARKER), "w", encoding="utf-8") as f:
+                f.write(str(time.time()))
+        except OSError as e:
+            self.failed.emit(key, str(e))
+            return
+        self.ready.emit(key, venv_python(self.venv_dir(key)))
+
+    def prefetch_wheels(self, req_paths: list[str]) -> str | None:
+        # Resolve the union of all requirement sets once into the wheelhouse.
+        if not req_paths:
+            return None
+        os.makedirs(self.wheelhouse, exist_ok=True)
+        args = ["-m", "pip", "--disable-pip-version-check", "wheel", "--find-links", self.wheelhouse, "-w", self.wheelhouse]
+        for req in req_paths:
+            args += ["-r", req]
+        job_key = "wheelhouse:" + hashlib.sha256("\0".join(sorted(req_paths)).encode("utf-8")).hexdigest()[:12]
+        self.installs.submit(job_key, f"wheelhouse ({len(req_paths)} requirement file(s))",
+                             [InstallStep(python_executable(), args)], total=count_requirements(*req_paths))
+        return job_key
+
+
+class BotLimits:
+    """Per-bot resource limits from the manifest's "limits" section.
+
+    nice, cpu_affinity and nofile are applied to the process right after it
+    spawns (Linux only); max_rss_mb is enforced by the sampler watchdog.
+    """
+
+    ACTIONS = ("restart", "kill")
+
+    def __init__(self, data: dict | None = None):
+        data = data or {}
+        self.max_rss_mb = self._number(data.get("max_rss_mb"), float)
+        self.nice = self._number(data.get("nice"), int)
+        self.nofile = self._number(data.get("nofile"), int)
+        self.cpu_affinity = self._cpu_list(data.get("cpu_affinity"))
+        self.on_exceed = data.get("on_exceed") if data.get("on_exceed") in self.ACTIONS else "restart"
+        self.grace_samples = max(1, self._number(data.get("grace_samples"), int) or 2)
+
+    @staticmethod
+    def _number(value, kind):
+        try:
+            return kind(value) if value not in (None, "") else None
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _cpu_list(cls, value) -> list[int] | None:
+        # Accepts [0, 1], 2 or "0,1" as written by hand; bad entries are skipped.
+        if isinstance(value, str):
+            value = value.replace(" ", "").split(",")
+        elif not isinstance(value, (list, tuple)):
+            value = [value]
+        cpus = {cls._number(c, int) for c in value}
+        cpus = sorted(c for c in cpus if c is not None and c >= 0)
+        return cpus or None
+
+    def is_empty(self) -> bool:
+        return self.max_rss_mb is None and self.nice is None and self.nofile is None and not self.cpu_affinity
+
+    def apply(self, pid: int) -> list[str]:
+        # Returns human-readable problems; an unprivileged user cannot lower
+        # nice below 0 or raise the hard RLIMIT_NOFILE, for example.
+        if not pid or not sys.platform.startswith("linux"):
+            return []
+        problems = []
+        if self.nice is not None:
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, self.nice)
+            except OSError as e:
+                problems.append(f"nice {self.nice}: {e}")
+        if self.cpu_affinity:
+            try:
+                os.sched_setaffinity(pid, self.cpu_affinity)
+            except OSError as e:
+                problems.append(f"CPU affinity {self.cpu_affinity}: {e}")
+        if self.nofile is not None:
+            resource = optional_import("resource")
+            try:
+                resource.prlimit(pid, resource.RLIMIT_NOFILE, (self.nofile, self.nofile))
+            except (OSError, ValueError, AttributeError) as e:
+                problems.append(f"RLIMIT_NOFILE {self.nofile}: {e}")
+        return problems
+
+
+class BotProcess:
+    def __init__(self, path: str):
+        self.path = path
+        self.folder = bot_folder(path)
+        self.name = bot_name(path)
+        self.process: QProcess | None = None
+        self.script: str | None = None
+        self.pid = 0
+        self.state = STATE_STOPPED
+        self.started_at: float | None = None
+        self.restarts = 0
+        self.exit_code: int | None = None
+        self.stop_requested = False
+        self.restart_pending = False
+        self.crash_times: deque[float] = deque()
+        self.backoff_level = 0
+        self.restart_timer: QTimer | None = None
+        self.next_restart_at: float | None = None
+        self.kill_timer: QTimer | None = None
+        self.venv_key: str | None = None
+        self.log_lines = 0
+        self.limits = BotLimits()
+        self.limit_strikes = 0
+
+    def reset_backoff(self):
+        self.crash_times.clear()
+        self.backoff_level = 0
+        self.next_restart_at = None
+        if self.restart_timer is not None:
+            self.restart_timer.stop()
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.state() != QProcess.NotRunning
+
+    def uptime(self) -> float:
+        if self.started_at is None or self.state != STATE_RUNNING:
+            return 0.0
+        return max(0.0, time.time() - self.started_at)
+
+    def snapshot(self) -> dict:
+        return {
+            "path": self.path,
+            "name": self.name,
+            "state": self.state,
+            "pid": self.pid,
+            "script": self.script,
+            "started_at": self.started_at,
+            "uptime": self.uptime(),
+            "restarts": self.restarts,
+            "exit_code": self.exit_code,
+            "log_lines": self.log_lines,
+        }
+
+
+class BotSupervisor(QObject):
+    state_changed = Signal(str, str)
+    output = Signal(str, list, bool)
+    bot_finished = Signal(str, int)
+    bot_error = Signal(str, str)
+    restart_scheduled = Signal(str, float)
+    bot_parked = Signal(str, int)
+
+    def __init__(self, parent=None, settings: dict | None = None):
+        super().__init__(parent)
+        self.settings = settings if settings is not None else {}
+        self._bots: dict[str, BotProcess] = {}
+        self._start_queue: deque[str] = deque()
+        self._queue_timer = QTimer(self)
+        self._queue_timer.setInterval(0)
+        self._queue_timer.timeout.connect(self._drain_start_queue)
+        self.shutting_down = False
+        self._logs: dict[str, BotLogStore] = {}
+        self._manifests: dict[str, tuple[float, BotManifest]] = {}
+        self._system_env: QProcessEnvironment | None = None
+        self._envs: dict[str, tuple[BotManifest, QProcessEnvironment]] = {}
+        self.folder_index = BotFolderIndex(self)
+        self.folder_index.changed.connect(self._on_folder_changed)
+        state_store().changed.connect(self._on_store_changed)
+        self.installs = InstallQueue(self, workers=int(self.settings.get("install_workers", 2)))
+        self.venvs = VenvManager(self.installs, self)
+        self.venvs.ready.connect(self._on_venv_ready)
+        self.venvs.failed.connect(self._on_venv_failed)
+        self.venvs.output.connect(self._on_venv_output)
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setInterval(1000)
+        self._log_flush_timer.timeout.connect(self.flush_logs)
+        self._log_flush_timer.start()
+
+    def bot(self, path: str) -> BotProcess:
+        handle = self._bots.get(path)
+        if handle is None:
+            handle = self._bots[path] = BotProcess(path)
+        return handle
+
+    def bots(self) -> list[BotProcess]:
+        return list(self._bots.values())
+
+    def state(self, path: str) -> str:
+        handle = self._bots.get(path)
+        return handle.state if handle else STATE_STOPPED
+
+    def is_running(self, path: str) -> bool:
+        handle = self._bots.get(path)
+        return handle is not None and handle.is_running()
+
+    def running_count(self) -> int:
+        return sum(1 for h in self._bots.values() if h.is_running())
+
+    def table(self) -> list[dict]:
+        return [h.snapshot() for h in self._bots.values()]
+
+    def forget(self, path: str):
+        handle = self._bots.get(path)
+        if handle is not None and not handle.is_running():
+            del self._bots[path]
+
+    def log_store(self, path: str) -> BotLogStore:
+        folder = bot_folder(path)
+        store = self._logs.get(folder)
+        if store is None:
+            store = self._logs[folder] = BotLogStore(folder)
+        return store
+
+    def flush_logs(self):
+        for store in self._logs.values():
+            store.flush()
+
+    def close_logs(self):
+        for store in self._logs.values():
+            store.close()
+
+    def manifest(self, path: str) -> BotManifest:
+        folder = bot_folder(path)
+        try:
+            mtime = os.path.getmtime(BotManifest.path_for(folder))
+        except OSError:
+            mtime = 0.0
+        cached = self._manifests.get(folder)
+        if cached is None or cached[0] != mtime:
+            cached = self._manifests[folder] = (mtime, BotManifest.load(folder))
+        return cached[1]
+
+    def _remember_manifest(self, manifest: BotManifest):
+        try:
+            mtime = os.path.getmtime(BotManifest.path_for(manifest.folder))
+        except OSError:
+            mtime = 0.0
+        self._manifests[manifest.folder] = (mtime, manifest)
+
+    def process_environment(self, path: str, manifest: BotManifest) -> QProcessEnvironment:
+        # system env < SETTINGS["env_vars"] < the bot's .env < manifest env.
+        # Cached per folder; dropped when .env, the settings or the manifest change.
+        key = BotFolderIndex.key(path)
+        cached = self._envs.get(key)
+        if cached is not None and cached[0] is manifest:
+            return cached[1]
+        if self._system_env is None:
+            self._system_env = QProcessEnvironment.systemEnvironment()
+        env = QProcessEnvironment(self._system_env)
+        for source in (self.settings.get("env_vars", {}), self.folder_index.env(path), manifest.env):
+            for k, v in source.items():
+                if k:
+                    env.insert(k, "" if v is None else str(v))
+        self._envs[key] = (manifest, env)
+        return env
+
+    def _on_store_changed(self, name: str):
+        if name == "settings":
+            self._envs.clear()
+
+    def _set_state(self, handle: BotProcess, state: str):
+        if handle.state != state:
+            handle.state = state
+            self.state_changed.emit(handle.path, state)
+
+
+    def grace_seconds(self) -> float:
+        try:
+            return max(0.0, float(self.settings.get("shutdown_grace_seconds", 5)))
+        except (TypeError, ValueError):
+            return 5.0
+
+    def start(self, path: str, reset_backoff: bool = True):
+        if self.shutting_down:
+            return
+        handle = self.bot(path)
+        if handle.is_running():
+            return
+        if reset_backoff:
+            handle.reset_backoff()
+        if handle.state == STATE_PREPARING:
+            return
+        manifest = self.manifest(path)
+        script = resolve_entry_point(path, manifest)
+        self._remember_manifest(manifest)
+        program = manifest.interpreter or python_executable()
+        req_path = self.folder_index.requirements_path(path)
+        if not manifest.interpreter and req_path and self.settings.get("isolated_venvs", False):
+            venv_py = self.venvs.python_for(req_path)
+            if venv_py is None:
+                # Created lazily on first start; start() is re-entered from _on_venv_ready.
+                handle.venv_key = self.venvs.key_for(req_path)
+                handle.stop_requested = False
+                self._set_state(handle, STATE_PREPARING)
+                self.log_store(path).append(["📦 Preparing isolated virtualenv"], "M")
+                self.venvs.ensure(req_path)
+                return
+            program = venv_py
+
+        handle.script = script
+        handle.stop_requested = False
+        handle.exit_code = None
+        handle.limits = BotLimits(manifest.limits)
+        handle.limit_strikes = 0
+        self._set_state(handle, STATE_STARTING)
+
+        proc = QProcess(self)
+        proc.setProgram(program)
+        proc.setArguments([script, *manifest.args])
+        proc.setWorkingDirectory(handle.folder)
+        proc.setProcessEnvironment(self.process_environment(path, manifest))
+        proc.setProcessChannelMode(QProcess.SeparateChannels)
+        proc.readyReadStandardOutput.connect(lambda h=handle, p=proc: self._read(h, p, False))
+        proc.readyReadStandardError.connect(lambda h=handle, p=proc: self._read(h, p, True))
+        proc.started.connect(lambda h=handle, p=proc: self._on_started(h, p))
+        proc.finished.connect(lambda code, status, h=handle, p=proc: self._on_finished(h, p, code))
+        proc.errorOccurred.connect(lambda err, h=handle, p=proc: self._on_error(h, p, err))
+        handle.process = proc
+        self.folder_index.watch(path, script)
+        self.log_store(path).append([f"▶ Starting {os.path.basename(script)}"], "M")
+        proc.start()
+
+    def stop(self, path: str):
+        handle = self._bots.get(path)
+        if handle is None:
+            return
+        if path in self._start_queue:
+            self._start_queue.remove(path)
+        if handle.state in (STATE_BACKOFF, STATE_PARKED, STATE_PREPARING):
+            handle.reset_backoff()
+            handle.venv_key = None
+            self._set_state(handle, STATE_STOPPED)
+        if not handle.is_running():
+            return
+        handle.stop_requested = True
+        self._set_state(handle, STATE_STOPPING)
+        handle.process.terminate()
+        # Escalate to kill() if the bot ignores the polite request.
+        if handle.kill_timer is None:
+            handle.kill_timer = QTimer(self)
+            handle.kill_timer.setSingleShot(True)
+            handle.kill_timer.timeout.connect(lambda h=handle: self._kill_if_alive(h, h.process))
+        handle.kill_timer.start(int(self.grace_seconds() * 1000))
+
+    def kill(self, path: str):
+        handle = self._bots.get(path)
+        if handle is not None and handle.is_running():
+            handle.stop_requested = True
+            self._kill_if_alive(handle, handle.process)
+
+    def _kill_if_alive(self, handle: BotProcess, proc: QProcess):
+        if handle.process is proc and proc is not None and proc.state() != QProcess.NotRunning:
+            self.log_store(handle.path).append(["⚠ Bot did not exit in time, killing it"], "M")
+            proc.kill()
+
+    def restart(self, path: str):
+        handle = self.bot(path)
+        if handle.is_running():
+            handle.restart_pending = True
+            self.stop(path)
+        else:
+            handle.restarts += 1
+            self.start_many([path])
+
+    def start_many(self, paths: list[str]):
+        for p in paths:
+            if p not in self._start_queue and not self.is_running(p):
+                self._start_queue.append(p)
+        if self._start_queue and not self._queue_timer.isActive():
+            self._queue_timer.start()
+
+    def stop_all(self):
+        self._start_queue.clear()
+        for path in list(self._bots):
+            self.stop(path)
+
+    def restart_all(self, paths: list[str]):
+        for p in paths:
+            self.restart(p)
+
+    def _drain_start_queue(self):
+        # One spawn per event-loop pass keeps the GUI responsive during bulk starts.
+        if not self._start_queue:
+            self._queue_timer.stop()
+            return
+        path = self._start_queue.popleft()
+        try:
+            self.start(path)
+        except Exception as e:
+            self._set_state(self.bot(path), STATE_CRASHED)
+            self.bot_error.emit(path, str(e))
+
+
+    def _read(self, handle: BotProcess, proc: QProcess, is_error: bool):
+        data = proc.readAllStandardError() if is_error else proc.readAllStandardOutput()
+        try:
+            text = bytes(data).decode(errors='ignore')
+        except Exception:
+            text = str(data)
+        lines = [l for l in text.splitlines() if l.strip()]
+        if lines:
+            handle.log_lines += len(lines)
+            self.log_store(handle.path).append(lines, "E" if is_error else "O")
+            self.output.emit(handle.path, lines, is_error)
+
+    def _on_started(self, handle: BotProcess, proc: QProcess):
+        if handle.process is not proc:
+            return
+        handle.pid = int(proc.processId())
+        handle.started_at = time.time()
+        problems = handle.limits.apply(handle.pid)
+        if problems:
+            self.log_store(handle.path).append([f"⚠ Could not apply limit: {p}" for p in problems], "M")
+        self._set_state(handle, STATE_RUNNING)
+
+    def enforce_limits(self, snap: "StatusSnapshot"):
+        # RSS watchdog; a bot must exceed its ceiling for grace_samples
+        # consecutive samples before it is restarted or killed.
+        for sample in snap.bots:
+            handle = self._bots.get(sample.path)
+            if handle is None or handle.state != STATE_RUNNING or handle.pid != sample.pid:
+                continue
+            limit = handle.limits.max_rss_mb
+            if limit is None or sample.rss is None or sample.rss <= limit * 1024 * 1024:
+                handle.limit_strikes = 0
+                continue
+            handle.limit_strikes += 1
+            if handle.limit_strikes < handle.limits.grace_samples:
+                continue
+            handle.limit_strikes = 0
+            action = handle.limits.on_exceed
+            msg = f"Memory limit exceeded ({sample.rss / (1024 * 1024):.0f} MB > {limit:.0f} MB), {action}ing"
+            self.log_store(handle.path).append([f"⛔ {msg}"], "M")
+            self.bot_error.emit(handle.path, msg)
+            handle.restart_pending = action == "restart"
+            handle.stop_requested = True
+            self._set_state(handle, STATE_STOPPING)
+            handle.process.kill()
+
+    def _on_finished(self, handle: BotProcess, proc: QProcess, code: int):
+        if handle.process is not proc:
+            return
+        if handle.kill_timer is not None:
+            handle.kill_timer.stop()
+        handle.process = None
+        handle.pid = 0
+        handle.exit_code = code
+        proc.deleteLater()
+        crashed = not handle.stop_requested and code not in (0, None)
+        store = self.log_store(handle.path)
+        store.append([f"⏹ Exited with code {code}"], "M")
+        store.flush()
+        self._set_state(handle, STATE_CRASHED if crashed else STATE_STOPPED)
+        self.bot_finished.emit(handle.path, code)
+        if self.shutting_down:
+            handle.restart_pending = False
+        elif handle.restart_pending:
+            handle.restart_pending = False
+            handle.restarts += 1
+            self.start_many([handle.path])
+        elif crashed and self.settings.get("auto_restart", False):
+            self._schedule_restart(handle, code)
+
+    def install_requirements(self, paths: list[str]) -> list[str]:
+        # Returns the install job keys; identical requirement sets share a job.
+        reqs = []
+        for p in paths:
+            req = self.folder_index.requirements_path(p)
+            if req and req not in reqs:
+                reqs.append(req)
+        if not reqs:
+            return []
+        if self.settings.get("isolated_venvs", False):
+            by_key = {}
+            for req in reqs:
+                by_key.setdefault(self.venvs.key_for(req), req)
+            wheel_job = self.venvs.prefetch_wheels(list(by_key.values())) if len(by_key) > 1 else None
+            return [VenvManager.job_key(self.venvs.ensure(req, force=True, after=[wheel_job] if wheel_job else None))
+                    for req in by_key.values()]
+        base = python_executable()
+        key = "pip:" + hashlib.sha256("\0".join(requirements_key(r, base) for r in sorted(reqs)).encode("utf-8")).hexdigest()[:12]
+        args = ["-m", "pip", "--disable-pip-version-check", "install"]
+        for req in reqs:
+            args += ["-r", req]
+        title = bot_name(reqs[0]) if len(reqs) == 1 else f"{len(reqs)} bots"
+        self.installs.submit(key, f"requirements for {title}", [InstallStep(base, args)], total=count_requirements(*reqs))
+        return [key]
+
+    def _waiting_on_venv(self, key: str) -> list[BotProcess]:
+        return [h for h in self._bots.values() if h.state == STATE_PREPARING and h.venv_key == key]
+
+    def _on_venv_ready(self, key: str, python: str):
+        for handle in self._waiting_on_venv(key):
+            handle.venv_key = None
+            self._set_state(handle, STATE_STOPPED)
+            try:
+                self.start(handle.path, reset_backoff=False)
+            except Exception as e:
+                self._set_state(handle, STATE_CRASHED)
+                self.bot_error.emit(handle.path, str(e))
+
+    def _on_venv_failed(self, key: str, msg: str):
+        for handle in self._waiting_on_venv(key):
+            handle.venv_key = None
+            self.log_store(handle.path).append([f"✖ {msg}"], "M")
+            self._set_state(handle, STATE_CRASHED)
+            self.bot_error.emit(handle.path, msg)
+
+    def _on_venv_output(self, key: str, lines: list):
+        for handle in self._waiting_on_venv(key):
+            self.log_store(handle.path).append(lines, "O")
+            self.output.emit(handle.path, lines, False)
+
+    def _on_folder_changed(self, folder: str, kind: str):
+        if kind in ("env", "folder"):
+            self._envs.pop(folder, None)
+        if kind != "source" or not self.settings.get("hot_reload", False):
+            return
+        for handle in self._bots.values():
+            if handle.is_running() and BotFolderIndex.key(handle.path) == folder:
+                self.log_store(handle.path).append(["🔁 Source changed, hot-reloading"], "M")
+                self.restart(handle.path)
+
+    def _schedule_restart(self, handle: BotProcess, code: int):
+        delay = RestartPolicy.from_settings(self.settings).next_delay(handle)
+        if delay is None:
+            handle.next_restart_at = None
+            self.log_store(handle.path).append([f"⛔ Crash loop detected, auto-restart parked (last code {code})"], "M")
+            self._set_state(handle, STATE_PARKED)
+            self.bot_parked.emit(handle.path, code)
+            return
+        if handle.restart_timer is None:
+            handle.restart_timer = QTimer(self)
+            handle.restart_timer.setSingleShot(True)
+            handle.restart_timer.timeout.connect(lambda h=handle: self._auto_restart(h))
+        handle.next_restart_at = time.time() + delay
+        handle.restart_timer.start(int(delay * 1000))
+        self._set_state(handle, STATE_BACKOFF)
+        self.restart_scheduled.emit(handle.path, delay)
+
+    def _auto_restart(self, handle: BotProcess):
+        if handle.state != STATE_BACKOFF:
+            return
+        handle.next_restart_at = None
+        handle.restarts += 1
+        try:
+            self.start(handle.path, reset_backoff=False)
+        except Exception as e:
+            self._set_state(handle, STATE_CRASHED)
+            self.bot_error.emit(handle.path, str(e))
+
+    def _on_error(self, handle: BotProcess, proc: QProcess, err):
+        if handle.process is not proc:
+            return
+        if err == QProcess.FailedToStart:
+            handle.process = None
+            proc.deleteLater()
+            self._set_state(handle, STATE_CRASHED)
+        elif err == QProcess.Crashed and handle.stop_requested:
+            # Our own kill on stop/restart/shutdown, not a failure.
+            return
+        self.bot_error.emit(handle.path, str(err))
+
+
+class StartupOrchestrator(QObject):
+    # Releases a start slot once a bot has produced output, exited, or
+    # survived warmup_ms, so heavy imports don't all hit the disk at once.
+    progress = Signal(int, int)
+    done = Signal()
+
+    def __init__(self, supervisor: BotSupervisor, paths: list[str], concurrency: int = 4,
+                 stagger_ms: int = 750, warmup_ms: int = 5000, parent=None):
+        super().__init__(parent)
+        self.supervisor = supervisor
+        self.concurrency = max(1, concurrency)
+        self.stagger_ms = max(0, stagger_ms)
+        self.warmup_ms = warmup_ms
+        self._pending: deque[str] = deque(p for p in paths if not supervisor.is_running(p))
+        self._total = len(self._pending)
+        self._launched = 0
+        self._in_flight: dict[str, QTimer] = {}
+        self._last_spawn = 0.0
+        self._active = False
+        self._pump_timer = QTimer(self)
+        self._pump_timer.setSingleShot(True)
+        self._pump_timer.timeout.connect(self._pump)
+        supervisor.output.connect(self._on_output)
+        supervisor.state_changed.connect(self._on_state)
+
+    @classmethod
+    def from_settings(cls, supervisor: BotSupervisor, paths: list[str], settings: dict, parent=None) -> "StartupOrchestrator":
+        return cls(
+            supervisor,
+            paths,
+            concurrency=int(settings.get("auto_start_concurrency", 4)),
+            stagger_ms=int(settings.get("auto_start_stagger_ms", 750)),
+            parent=parent,
+        )
+
+    def start(self):
+        self._active = True
+        self._pump()
+
+    def cancel(self):
+        self._pending.clear()
+        self._finish()
+
+    def _pump(self):
+        if not self._active:
+            return
+        while self._pending and len(self._in_flight) < self.concurrency:
+            wait_ms = int(self.stagger_ms - (time.monotonic() - self._last_spawn) * 1000)
+            if wait_ms > 0:
+                self._pump_timer.start(wait_ms)
+                return
+            path = self._pending.popleft()
+            self._last_spawn = time.monotonic()
+            self._launched += 1
+            try:
+                self.supervisor.start(path)
+            except Exception as e:
+                self.supervisor.bot_error.emit(path, str(e))
+            else:
+                timer = QTimer(self)
+                timer.setSingleShot(True)
+                timer.timeout.connect(lambda p=path: self._release(p))
+                timer.start(self.warmup_ms)
+                self._in_flight[path] = timer
+            self.progress.emit(self._launched, self._total)
+        if not self._pending and not self._in_flight:
+            self._finish()
+
+    def _release(self, path: str):
+        timer = self._in_flight.pop(path, None)
+        if timer is None:
+            return
+        timer.stop()
+        timer.deleteLater()
+        self._pump()
+
+    def _on_output(self, path: str, lines: list, is_error: bool):
+        if path in self._in_flight:
+            self._release(path)
+
+    def _on_state(self, path: str, state: str):
+        if path in self._in_flight and state not in (STATE_STARTING, STATE_RUNNING, STATE_PREPARING):
+            self._release(path)
+
+    def _finish(self):
+        if not self._active:
+            return
+        self._active = False
+        self._pump_timer.stop()
+        for timer in self._in_flight.values():
+            timer.stop()
+        self._in_flight.clear()
+        self.supervisor.output.disconnect(self._on_output)
+        self.supervisor.state_changed.disconnect(self._on_state)
+        self.done.emit()
+
+
+class ShutdownCoordinator(QObject):
+    """Stops every bot within a bounded time, then runs the exit cleanup.
+
+    All bots get terminate() at once; whatever is still running after the
+    grace period is killed and reaped. Afterwards installs are cancelled,
+    the temp folder is removed (cleanup_temp_on_close), pending state is
+    flushed and the log stores are closed. `finished` fires exactly once.
+    """
+
+    progress = Signal(int)
+    finished = Signal()
+
+    def __init__(self, supervisor: BotSupervisor, grace_seconds: float | None = None, parent=None):
+        super().__init__(parent)
+        self.supervisor = supervisor
+        self.grace_seconds = supervisor.grace_seconds() if grace_seconds is None else grace_seconds
+        self._started = False
+        self._done = False
+        self._deadline = QTimer(self)
+        self._deadline.setSingleShot(True)
+        self._deadline.timeout.connect(self._escalate)
+
+    def is_done(self) -> bool:
+        return self._done
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        sup = self.supervisor
+        sup.shutting_down = True
+        sup.state_changed.connect(self._on_state)
+        sup.installs.cancel_all()
+        sup.stop_all()
+        remaining = sup.running_count()
+        if remaining == 0:
+            self._finish()
+            return
+        self.progress.emit(remaining)
+        self._deadline.start(int(self.grace_seconds * 1000))
+
+    def run_blocking(self):
+        # For aboutToQuit and other callers that cannot return to the event loop.
+        self.start()
+        deadline = time.monotonic() + self.grace_seconds
+        for handle in self.supervisor.bots():
+            proc = handle.process
+            if proc is not None:
+                proc.waitForFinished(max(0, int((deadline - time.monotonic()) * 1000)))
+        self._escalate()
+
+    def _on_state(self, path: str, state: str):
+        if self._done:
+            return
+        remaining = self.supervisor.running_count()
+        self.progress.emit(remaining)
+        if remaining == 0:
+            self._finish()
+
+    def _escalate(self):
+        if self._done:
+            return
+        stragglers = [h.process for h in self.supervisor.bots() if h.is_running()]
+        for proc in stragglers:
+            proc.kill()
+        for proc in stragglers:
+            # Reap here so no zombie interpreter outlives the manager.
+            proc.waitForFinished(2000)
+        self._finish()
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        self._deadline.stop()
+        try:
+            self.supervisor.state_changed.disconnect(self._on_state)
+        except (RuntimeError, TypeError):
+            pass
+        if self.supervisor.settings.get("cleanup_temp_on_close", False) and os.path.isdir(TEMP_EXTRACT_DIR):
+            shutil.rmtree(TEMP_EXTRACT_DIR, ignore_errors=True)
+        state_store().flush()
+        self.supervisor.close_logs()
+        self.finished.emit()
+
+
+class BotSample(NamedTuple):
+    path: str
+    pid: int
+    cpu: float | None
+    rss: int | None
+
+
+class GpuSample(NamedTuple):
+    load: float
+    memory_used: float
+    memory_total: float
+
+
+class StatusSnapshot(NamedTuple):
+    timestamp: float
+    net_ok: bool | None
+    cpu: float | None
+    ram_percent: float | None
+    ram_used: int | None
+    ram_total: int | None
+    gpu: GpuSample | None
+    bots: tuple[BotSample, ...]
+
+    def bot(self, path: str) -> BotSample | None:
+        for b in self.bots:
+            if b.path == path:
+                return b
+        return None
+
+
+class MetricRing:
+    """Fixed-capacity ring of (timestamp, cpu, rss) samples in flat arrays."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._ts = array("d", bytes(8 * capacity))
+        self._cpu = array("f", bytes(4 * capacity))
+        self._rss = array("d", bytes(8 * capacity))
+        self._head = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, ts: float, cpu: float, rss: float):
+        i = self._head
+        self._ts[i] = ts
+        self._cpu[i] = cpu
+        self._rss[i] = rss
+        self._head = (i + 1) % self.capacity
+        if self._len < self.capacity:
+            self._len += 1
+
+    def series(self, field: str, last: int | None = None) -> list[float]:
+        # Oldest first; `field` is "ts", "cpu" or "rss".
+        data = getattr(self, "_" + field)
+        n = self._len if last is None else min(last, self._len)
+        start = (self._head - n) % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            return data[start:end].tolist()
+        return data[start:].tolist() + data[:end - self.capacity].tolist()
+
+
+class _Downsampler:
+    # Folds samples into fixed-width buckets (mean CPU, peak RSS) and pushes
+    # each completed bucket into `ring` and on to the next coarser level.
+    def __init__(self, width: float, ring: MetricRing, upstream: "_Downsampler | None" = None):
+        self.width = width
+        self.ring = ring
+        self.upstream = upstream
+        self._key: int | None = None
+        self._n = 0
+        self._cpu_sum = 0.0
+        self._rss_max = 0.0
+
+    def add(self, ts: float, cpu: float, rss: float):
+        key = int(ts // self.width)
+        if self._key is not None and key != self._key:
+            self._emit()
+        self._key = key
+        self._n += 1
+        self._cpu_sum += cpu
+        self._rss_max = max(self._rss_max, rss)
+
+    def _emit(self):
+        if self._n:
+            ts = self._key * self.width
+            cpu = self._cpu_sum / self._n
+            self.ring.append(ts, cpu, self._rss_max)
+            if self.upstream is not None:
+                self.upstream.add(ts, cpu, self._rss_max)
+        self._n = 0
+        self._cpu_sum = 0.0
+        self._rss_max = 0.0
+
+
+class BotHistory:
+    RESOLUTIONS = ("raw", "1m", "1h")
+
+    def __init__(self, raw_capacity: int = 600, minute_capacity: int = 24 * 60,
+                 hour_capacity: int = 24 * 30):
+        self.raw = MetricRing(raw_capacity)
+        self.minutes = MetricRing(minute_capacity)
+        self.hours = MetricRing(hour_capacity)
+        self._hour_bucket = _Downsampler(3600.0, self.hours)
+        self._minute_bucket = _Downsampler(60.0, self.minutes, self._hour_bucket)
+
+    def add(self, ts: float, cpu: float, rss: float):
+        self.raw.append(ts, cpu, rss)
+        self._minute_bucket.add(ts, cpu, rss)
+
+    def ring(self, resolution: str) -> MetricRing:
+        return {"raw": self.raw, "1m": self.minutes, "1h": self.hours}[resolution]
+
+
+class ResourceHistory:
+    """Per-bot CPU/RSS history fed from sampler snapshots (GUI thread only)."""
+
+    def __init__(self, **capacities):
+        self._capacities = capacities
+        self._bots: dict[str, BotHistory] = {}
+
+    def record(self, snap: StatusSnapshot):
+        for sample in snap.bots:
+            if sample.cpu is None or sample.rss is None:
+                continue
+            hist = self._bots.get(sample.path)
+            if hist is None:
+                hist = self._bots[sample.path] = BotHistory(**self._capacities)
+            hist.add(snap.timestamp, sample.cpu, float(sample.rss))
+
+    def get(self, path: str) -> BotHistory | None:
+        return self._bots.get(path)
+
+    def series(self, path: str, field: str, resolution: str = "raw",
+               last: int | None = None) -> list[float]:
+        hist = self._bots.get(path)
+        if hist is None:
+            return []
+        return hist.ring(resolution).series(field, last)
+
+    def forget(self, path: str):
+        self._bots.pop(path, None)
+
+
+class StatusSampler(QThread):
+    snapshot_ready = Signal(object)
+
+    def __init__(self, supervisor: BotSupervisor | None = None, interval_ms: int = 1500,
+                 net_interval_ms: int = 15000, parent=None):
+        super().__init__(parent)
+        self._interval = interval_ms / 1000.0
+        self._net_interval = net_interval_ms / 1000.0
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pids: dict[str, int] = {}
+        self._proc_handles: dict[int, object] = {}
+        self._net_ok: bool | None = None
+        self._net_checked = 0.0
+        self._psutil = None
+        self._gputil = None
+        self._gpu_available = False
+        self.latest: StatusSnapshot | None = None
+        self.history = ResourceHistory()
+        if supervisor is not None:
+            self.snapshot_ready.connect(supervisor.enforce_limits)
+            supervisor.state_changed.connect(lambda *_: self.set_bot_pids(
+                {h.path: h.pid for h in supervisor.bots() if h.pid}))
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+        self.snapshot_ready.connect(self._remember)
+
+    def _remember(self, snap: StatusSnapshot):
+        self.latest = snap
+        self.history.record(snap)
+
+    def set_bot_pids(self, pids: dict[str, int]):
+        with self._lock:
+            self._pids = dict(pids)
+
+    def stop(self):
+        self.requestInterruption()
+        self._wake.set()
+        self.wait(3000)
+
+    def run(self):
+        self._psutil = optional_import("psutil")
+        if shutil.which("nvidia-smi") is not None:
+            self._gputil = optional_import("GPUtil")
+        self._gpu_available = self._gputil is not None
+        self._wake.clear()
+        while not self.isInterruptionRequested():
+            self.snapshot_ready.emit(self.sample())
+            self._wake.wait(self._interval)
+
+    def sample(self) -> StatusSnapshot:
+        now = time.monotonic()
+        if self._net_ok is None or now - self._net_checked >= self._net_interval:
+            self._net_ok = self._probe_net()
+            self._net_checked = now
+
+        cpu = ram_percent = ram_used = ram_total = None
+        if self._psutil is not None:
+            try:
+                cpu = self._psutil.cpu_percent(interval=None)
+                vm = self._psutil.virtual_memory()
+                ram_percent, ram_used, ram_total = vm.percent, vm.used, vm.total
+            except Exception:
+                pass
+
+        return StatusSnapshot(
+            timestamp=time.time(),
+            net_ok=self._net_ok,
+            cpu=cpu,
+            ram_percent=ram_percent,
+            ram_used=ram_used,
+            ram_total=ram_total,
+            gpu=self._probe_gpu(),
+            bots=self._probe_bots(),
+        )
+
+    def _probe_net(self) -> bool:
+        try:
+            socket.create_connection(("1.1.1.1", 53), timeout=1).close()
+            return True
+        except Exception:
+            return False
+
+    def _probe_gpu(self) -> GpuSample | None:
+        if not self._gpu_available:
+            return None
+        try:
+            gpus = self._gputil.getGPUs()
+        except Exception:
+            # nvidia-smi is present but unusable; don't pay for it again every tick.
+            self._gpu_available = False
+            return None
+        if not gpus:
+            return None
+        g = gpus[0]
+        return GpuSample(g.load, g.memoryUsed, g.memoryTotal)
+
+    def _probe_bots(self) -> tuple[BotSample, ...]:
+        with self._lock:
+            pids = dict(self._pids)
+        if self._psutil is None:
+            return tuple(BotSample(path, pid, None, None) for path, pid in pids.items())
+        live = set(pids.values())
+        for pid in list(self._proc_handles):
+            if pid not in live:
+                del self._proc_handles[pid]
+        samples = []
+        for path, pid in pids.items():
+            cpu = rss = None
+            try:
+                proc = self._proc_handles.get(pid)
+                if proc is None:
+                    proc = self._proc_handles[pid] = self._psutil.Process(pid)
+                    proc.cpu_percent(interval=None)
+                cpu = proc.cpu_percent(interval=None)
+                rss = proc.memory_info().rss
+            except Exception:
+                self._proc_handles.pop(pid, None)
+            samples.append(BotSample(path, pid, cpu, rss))
+        return tuple(samples)
+
+
+OAUTH_CLIENT_ID = "1429597807161114624"
+DISCORD_API_BASE = os.environ.get("DISCORD_API_BASE", "https://discord.com/api")
+
+_HTTP_SESSION = None
+_HTTP_SESSION_LOCK = threading.Lock()
+
+
+class OAuthError(Exception):
+    pass
+
+
+def http_session():
+    # One pooled keep-alive session shared by all Discord API calls.
+    global _HTTP_SESSION
+    requests = optional_import("requests")
+    if requests is None:
+        raise OAuthError("Python package 'requests' is missing. Please run: pip install requests")
+    with _HTTP_SESSION_LOCK:
+        if _HTTP_SESSION is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _HTTP_SESSION = session
+        return _HTTP_SESSION
+
+
+class DiscordOAuth:
+    def __init__(self, client_id: str = OAUTH_CLIENT_ID, api_base: str | None = None):
+        self.client_id = client_id
+        self.api_base = (api_base or DISCORD_API_BASE).rstrip("/")
+
+    def _token_request(self, data: dict) -> dict:
+        try:
+            resp = http_session().post(f"{self.api_base}/oauth2/token", data=data, timeout=8)
+        except OAuthError:
+            raise
+        except Exception as e:
+            raise OAuthError(f"Network error: {e}") from e
+        if resp.status_code != 200:
+            raise OAuthError(f"Token exchange failed: HTTP {resp.status_code} {resp.text[:120]}")
+        token_json = resp.json()
+        if not token_json.get("access_token"):
+            raise OAuthError("No access_token in token response.")
+        return token_json
+
+    def exchange_code(self, code: str, code_verifier: str, redirect_uri: str) -> dict:
+        return self._token_request({
+            "client_id": self.client_id,
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": redirect_uri,
+            "code_verifier": code_verifier,
+        })
+
+    def refresh(self, refresh_token: str) -> dict:
+        return self._token_request({
+            "client_id": self.client_id,
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        })
+
+    def fetch_user(self, access_token: str) -> dict:
+        try:
+            resp = http_session().get(
+                f"{self.api_base}/users/@me",
+                headers={"Authorization": f"Bearer {access_token}"},
+                timeout=5,
+            )
+        except OAuthError:
+            raise
+        except Exception as e:
+            raise OAuthError(f"Network error: {e}") from e
+        if resp.status_code != 200:
+            raise OAuthError(f"Login failed: HTTP {resp.status_code}")
+        return resp.json()
+
+
+class OAuthExchangeWorker(QObject):
+    succeeded = Signal(dict, dict)
+    failed = Signal(str)
+
+    def __init__(self, oauth: DiscordOAuth, code: str, code_verifier: str, redirect_uri: str, parent=None):
+        super().__init__(parent)
+        self.oauth = oauth
+        self._args = (code, code_verifier, redirect_uri)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        try:
+            token_json = self.oauth.exchange_code(*self._args)
+            user = self.oauth.fetch_user(token_json["access_token"])
+        except OAuthError as e:
+            self.failed.emit(str(e))
+        except Exception as e:
+            self.failed.emit(f"Network error: {e}")
+        else:
+            self.succeeded.emit(token_json, user)
+
+
+class CredentialCache:
+    # Access/refresh tokens are sealed with a random per-user key
+    # (HMAC-SHA256 keystream, encrypt-then-MAC). The key itself lives in
+    # the OS keyring when available, DPAPI-protected on Windows, or in an
+    # owner-only file otherwise.
+    MAGIC = b"BMC1"
+    KEYRING_SERVICE = "DiscordBotManagerQt"
+
+    def __init__(self, path: str | None = None):
+        base = user_cache_dir()
+        self.path = path or os.path.join(base, "session.bin")
+        self.key_path = os.path.join(os.path.dirname(self.path), "session.key")
+        self._key: bytes | None = None
+
+    def _dpapi(self, data: bytes, protect: bool) -> bytes:
+        import ctypes
+        from ctypes import wintypes
+
+        class Blob(ctypes.Structure):
+            _fields_ = [("cbData", wintypes.DWORD), ("pbData", ctypes.POINTER(ctypes.c_char))]
+
+        buf = ctypes.create_string_buffer(data, len(data))
+        blob_in = Blob(len(data), ctypes.cast(buf, ctypes.POINTER(ctypes.c_char)))
+        blob_out = Blob()
+        fn = ctypes.windll.crypt32.CryptProtectData if protect else ctypes.windll.crypt32.CryptUnprotectData
+        if not fn(ctypes.byref(blob_in), None, None, None, None, 0, ctypes.byref(blob_out)):
+            raise OSError("DPAPI call failed")
+        try:
+            return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+        finally:
+            ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+    def _load_key(self, create: bool) -> bytes | None:
+        if self._key is not None:
+            return self._key
+        keyring = optional_import("keyring")
+        if keyring is not None:
+            try:
+                stored = keyring.get_password(self.KEYRING_SERVICE, "session-key")
+                if stored:
+                    self._key = bytes.fromhex(stored)
+                    return self._key
+                if create:
+                    key = os.urandom(32)
+                    keyring.set_password(self.KEYRING_SERVICE, "session-key", key.hex())
+                    self._key = key
+                    return key
+            except Exception:
+                pass
+        if os.path.exists(self.key_path):
+            with open(self.key_path, "rb") as f:
+                raw = f.read()
+            self._key = self._dpapi(raw, False) if os.name == "nt" else raw
+            return self._key
+        if not create:
+            return None
+        key = os.urandom(32)
+        os.makedirs(os.path.dirname(self.key_path), exist_ok=True)
+        raw = self._dpapi(key, True) if os.name == "nt" else key
+        fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        self._key = key
+        return key
+
+    @staticmethod
+    def _keystream(key: bytes, nonce: bytes, length: int) -> bytes:
+        out = bytearray()
+        counter = 0
+        while len(out) < length:
+            out += hmac.new(key, nonce + counter.to_bytes(8, "big"), hashlib.sha256).digest()
+            counter += 1
+        return bytes(out[:length])
+
+    def _seal(self, key: bytes, plain: bytes) -> bytes:
+        enc_key = hmac.new(key, b"enc", hashlib.sha256).digest()
+        mac_key = hmac.new(key, b"mac", hashlib.sha256).digest()
+        nonce = os.urandom(16)
+        cipher = bytes(a ^ b for a, b in zip(plain, self._keystream(enc_key, nonce, len(plain))))
+        body = self.MAGIC + nonce + cipher
+        return body + hmac.new(mac_key, body, hashlib.sha256).digest()
+
+    def _open(self, key: bytes, blob: bytes) -> bytes:
+        enc_key = hmac.new(key, b"enc", hashlib.sha256).digest()
+        mac_key = hmac.new(key, b"mac", hashlib.sha256).digest()
+        body, tag = blob[:-32], blob[-32:]
+        if not body.startswith(self.MAGIC) or not hmac.compare_digest(tag, hmac.new(mac_key, body, hashlib.sha256).digest()):
+            raise ValueError("credential cache is corrupt or was written with another key")
+        nonce, cipher = body[4:20], body[20:]
+        return bytes(a ^ b for a, b in zip(cipher, self._keystream(enc_key, nonce, len(cipher))))
+
+    def load(self) -> dict | None:
+        try:
+            if not os.path.exists(self.path):
+                return None
+            key = self._load_key(create=False)
+            if key is None:
+                return None
+            with open(self.path, "rb") as f:
+                return json.loads(self._open(key, f.read()).decode("utf-8"))
+        except Exception:
+            return None
+
+    def save(self, token_json: dict, user: dict | None):
+        expires_in = token_json.get("expires_in")
+        data = {
+            "access_token": token_json.get("access_token"),
+            "refresh_token": token_json.get("refresh_token"),
+            "expires_at": time.time() + float(expires_in) if expires_in else None,
+            "user": user,
+        }
+        try:
+            key = self._load_key(create=True)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._seal(key, json.dumps(data).encode("utf-8")))
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class CachedSessionWorker(QObject):
+    # Emits the cached session (possibly refreshed) or None if a full login
+    # is required. A still-valid token is accepted without any network call.
+    finished = Signal(object)
+
+    def __init__(self, cache: CredentialCache | None = None, oauth: DiscordOAuth | None = None,
+                 min_validity: float = 300.0, parent=None):
+        super().__init__(parent)
+        self.cache = cache or CredentialCache()
+        self.oauth = oauth or DiscordOAuth()
+        self.min_validity = min_validity
+        self.result = None
+        self.done = False
+        self.finished.connect(self._remember)
+
+    def _remember(self, result):
+        self.result = result
+        self.done = True
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        data = self.cache.load()
+        if not data or not data.get("access_token"):
+            self.finished.emit(None)
+            return
+        expires_at = data.get("expires_at")
+        if data.get("user") and expires_at and expires_at - time.time() > self.min_validity:
+            self.finished.emit(data)
+            return
+        if not data.get("refresh_token"):
+            self.finished.emit(None)
+            return
+        try:
+            token_json = self.oauth.refresh(data["refresh_token"])
+            token_json.setdefault("refresh_token", data["refresh_token"])
+            user = self.oauth.fetch_user(token_json["access_token"])
+        except Exception:
+            self.finished.emit(None)
+            return
+        self.cache.save(token_json, user)
+        self.finished.emit(self.cache.load())
+
+
+def _om_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _om_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsExporter(QObject):
+    """Serves supervisor and sampler numbers as OpenMetrics on localhost.
+
+    The exposition text is rendered on the GUI thread after every sampler
+    snapshot; the HTTP thread only hands out the cached bytes, so it never
+    touches Qt objects. Enabled and re-bound from the metrics_* settings.
+    """
+
+    CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+    failed = Signal(str)
+
+    def __init__(self, supervisor: BotSupervisor, sampler: "StatusSampler", host: str = "127.0.0.1", parent=None):
+        super().__init__(parent)
+        self.supervisor = supervisor
+        self.sampler = sampler
+        self.host = host
+        self._server = None
+        self._port: int | None = None
+        self._lock = threading.Lock()
+        self._payload = b"# EOF\n"
+        self._line_marks: dict[str, tuple[float, int]] = {}
+        self._line_rates: dict[str, float] = {}
+        sampler.snapshot_ready.connect(self._render)
+        state_store().changed.connect(self._on_store_changed)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    @property
+    def port(self) -> int | None:
+        return self._port
+
+    def apply_settings(self):
+        settings = self.supervisor.settings
+        port = int(settings.get("metrics_port", 9464))
+        if not settings.get("metrics_enabled", False):
+            self.stop()
+        elif self._server is None or port != self._port:
+            self.stop()
+            self.start(port)
+
+    def start(self, port: int):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                with exporter._lock:
+                    body = exporter._payload
+                self.send_response(200)
+                self.send_header("Content-Type", exporter.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            srv = ThreadingHTTPServer((self.host, port), Handler)
+        except OSError as e:
+            self.failed.emit(f"Metrics endpoint could not bind {self.host}:{port}: {e}")
+            return
+        srv.daemon_threads = True
+        self._server = srv
+        self._port = port
+        self._render(self.sampler.latest)
+        if not self.sampler.isRunning():
+            self.sampler.start()
+        threading.Thread(target=srv.serve_forever, name="metrics-http", daemon=True).start()
+
+    def stop(self):
+        srv, self._server = self._server, None
+        self._port = None
+        if srv is None:
+            return
+
+        def shutdown():
+            srv.shutdown()
+            srv.server_close()
+        threading.Thread(target=shutdown, daemon=True).start()
+
+    def _on_store_changed(self, name: str):
+        if name == "settings":
+            self.apply_settings()
+
+    def _update_line_rates(self, now: float):
+        for handle in self.supervisor.bots():
+            last = self._line_marks.get(handle.path)
+            if last is not None and now > last[0]:
+                self._line_rates[handle.path] = max(0, handle.log_lines - last[1]) / (now - last[0])
+            self._line_marks[handle.path] = (now, handle.log_lines)
+
+    def _render(self, snap: "StatusSnapshot | None"):
+        if self._server is None:
+            return
+        now = time.time()
+        self._update_line_rates(now)
+        out: list[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: list[tuple[str, dict, float]]):
+            if not samples:
+                return
+            out.append(f"# TYPE {name} {kind}")
+            out.append(f"# HELP {name} {help_text}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{k}="{_om_escape(str(v))}"' for k, v in labels.items())
+                out.append(f"{name}{suffix}{{{label_text}}} {_om_number(value)}" if label_text
+                           else f"{name}{suffix} {_om_number(value)}")
+
+        if snap is not None:
+            if snap.net_ok is not None:
+                family("botmanager_network_up", "gauge", "Whether the internet probe succeeded.", [("", {}, int(snap.net_ok))])
+            if snap.cpu is not None:
+                family("botmanager_host_cpu_percent", "gauge", "Host CPU utilisation.", [("", {}, float(snap.cpu))])
+            if snap.ram_used is not None:
+                family("botmanager_host_memory_used_bytes", "gauge", "Host memory in use.", [("", {}, int(snap.ram_used))])
+            if snap.ram_total is not None:
+                family("botmanager_host_memory_total_bytes", "gauge", "Host memory size.", [("", {}, int(snap.ram_total))])
+            if snap.gpu is not None:
+                family("botmanager_gpu_load_ratio", "gauge", "GPU utilisation (0-1).", [("", {}, float(snap.gpu.load))])
+                family("botmanager_gpu_memory_used_bytes", "gauge", "GPU memory in use.",
+                       [("", {}, int(snap.gpu.memory_used * 1024 * 1024))])
+
+        handles = self.supervisor.bots()
+        labels = {h.path: {"bot": h.name, "path": h.path} for h in handles}
+        family("botmanager_bots_running", "gauge", "Number of running bots.", [("", {}, self.supervisor.running_count())])
+        family("botmanager_bot_up", "gauge", "1 if the bot process is running.",
+               [("", labels[h.path], int(h.state == STATE_RUNNING)) for h in handles])
+        family("botmanager_bot_uptime_seconds", "gauge", "Seconds since the bot process started.",
+               [("", labels[h.path], round(h.uptime(), 3)) for h in handles])
+        family("botmanager_bot_restarts", "counter", "Restarts since the manager started.",
+               [("_total", labels[h.path], h.restarts) for h in handles])
+        family("botmanager_bot_log_lines", "counter", "Output lines written by the bot.",
+               [("_total", labels[h.path], h.log_lines) for h in handles])
+        family("botmanager_bot_log_lines_per_second", "gauge", "Output lines per second over the last sample interval.",
+               [("", labels[h.path], round(self._line_rates.get(h.path, 0.0), 3)) for h in handles])
+        family("botmanager_bot_last_exit_code", "gauge", "Exit code of the last bot process.",
+               [("", labels[h.path], h.exit_code) for h in handles if h.exit_code is not None])
+        if snap is not None:
+            family("botmanager_bot_cpu_percent", "gauge", "Bot process CPU utilisation.",
+                   [("", labels[b.path], float(b.cpu)) for b in snap.bots if b.cpu is not None and b.path in labels])
+            family("botmanager_bot_resident_memory_bytes", "gauge", "Bot process resident set size.",
+                   [("", labels[b.path], int(b.rss)) for b in snap.bots if b.rss is not None and b.path in labels])
+        out.append("# EOF")
+        payload = ("\n".join(out) + "\n").encode("utf-8")
+        with self._lock:
+            self._payload = payload
+
+
+def control_file_path() -> str:
+    return os.environ.get("BOT_MANAGER_CONTROL_FILE") or os.path.join(user_cache_dir(), "control.json")
+
+
+class ControlError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _GuiCall(QObject):
+    # Runs callables on the thread this object lives in; HTTP threads block
+    # on a threading.Event until the queued call has completed.
+    invoke = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.invoke.connect(self._run)
+
+    def _run(self, job):
+        fn, done, box = job
+        try:
+            box["result"] = fn()
+        except Exception as e:
+            box["error"] = e
+        finally:
+            done.set()
+
+    def call(self, fn, timeout: float = 15.0):
+        done = threading.Event()
+        box: dict = {}
+        self.invoke.emit((fn, done, box))
+        if not done.wait(timeout):
+            raise ControlError(504, "The manager did not respond in time.")
+        if "error" in box:
+            raise box["error"]
+        return box.get("result")
+
+
+class ControlServer(QObject):
+    """Token-protected JSON control API on localhost for scripts and the CLI.
+
+    The bound port and a random token are written to control_file_path()
+    (owner-only); every request must send "Authorization: Bearer <token>".
+    Requests are executed on the GUI thread through _GuiCall.
+
+        GET  /status[?bot=NAME]          GET /tail?bot=NAME[&lines=N][&since=TS]
+        POST /start|/stop|/restart       body: {"bots": [NAME, ...]} or {"all": true}
+    """
+
+    ACTIONS = ("start", "stop", "restart")
+    failed = Signal(str)
+
+    def __init__(self, supervisor: BotSupervisor, host: str = "127.0.0.1", parent=None):
+        super().__init__(parent)
+        self.supervisor = supervisor
+        self.host = host
+        self.token = secrets.token_urlsafe(32)
+        self._server = None
+        self._port: int | None = None
+        self._gui = _GuiCall(self)
+        state_store().changed.connect(self._on_store_changed)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    @property
+    def port(self) -> int | None:
+        return self._port
+
+    def apply_settings(self):
+        settings = self.supervisor.settings
+        port = int(settings.get("control_port", 0) or 0)
+        if not settings.get("control_api_enabled", True):
+            self.stop()
+        elif self._server is None or (port and port != self._port):
+            self.stop()
+            self.start(port)
+
+    def start(self, port: int = 0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+
+        control = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, payload: dict):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self, method: str):
+                auth = self.headers.get("Authorization", "")
+                if not hmac.compare_digest(auth, f"Bearer {control.token}"):
+                    self._reply(401, {"error": "Missing or wrong token."})
+                    return
+                url = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                body = {}
+                if method == "POST":
+                    try:
+                        length = int(self.headers.get("Content-Length") or 0)
+                        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                    except (ValueError, json.JSONDecodeError):
+                        self._reply(400, {"error": "Body must be JSON."})
+                        return
+                try:
+                    result = control._gui.call(lambda: control.dispatch(method, url.path.strip("/"), query, body))
+                except ControlError as e:
+                    self._reply(e.status, {"error": str(e)})
+                except Exception as e:
+                    self._reply(500, {"error": str(e)})
+                else:
+                    self._reply(200, result)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            srv = ThreadingHTTPServer((self.host, port), Handler)
+        except OSError as e:
+            self.failed.emit(f"Control API could not bind {self.host}:{port}: {e}")
+            return
+        srv.daemon_threads = True
+        self._server = srv
+        self._port = srv.server_address[1]
+        self._write_control_file()
+        threading.Thread(target=srv.serve_forever, name="control-http", daemon=True).start()
+
+    def stop(self):
+        srv, self._server = self._server, None
+        self._port = None
+        if srv is None:
+            return
+        try:
+            with open(control_file_path(), "r", encoding="utf-8") as f:
+                if json.load(f).get("pid") == os.getpid():
+                    os.remove(control_file_path())
+        except (OSError, ValueError):
+            pass
+
+        def shutdown():
+            srv.shutdown()
+            srv.server_close()
+        threading.Thread(target=shutdown, daemon=True).start()
+
+    def _write_control_file(self):
+        path = control_file_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write_text(path, json.dumps({"host": self.host, "port": self._port,
+                                                "token": self.token, "pid": os.getpid()}))
+            if os.name != "nt":
+                os.chmod(path, 0o600)
+        except OSError as e:
+            self.failed.emit(f"Control API could not write {path}: {e}")
+
+    def _on_store_changed(self, name: str):
+        if name == "settings":
+            self.apply_settings()
+
+    def known_paths(self) -> list[str]:
+        paths = list(state_store().bot_files())
+        paths += [h.path for h in self.supervisor.bots() if h.path not in paths]
+        return paths
+
+    def resolve(self, names: list[str]) -> list[str]:
+        known = self.known_paths()
+        out = []
+        for name in names:
+            matches = [p for p in known if name in (p, bot_name(p), os.path.basename(p))]
+            if not matches:
+                raise ControlError(404, f"Unknown bot: {name}")
+            if len(matches) > 1:
+                raise ControlError(409, f"Ambiguous bot name {name!r}; use the full path.")
+            if matches[0] not in out:
+                out.append(matches[0])
+        return out
+
+    def _status(self, path: str) -> dict:
+        handle = next((h for h in self.supervisor.bots() if h.path == path), None)
+        if handle is not None:
+            return handle.snapshot()
+        return {"path": path, "name": bot_name(path), "state": STATE_STOPPED}
+
+    @staticmethod
+    def _query_number(query: dict, key: str, kind, default=None):
+        value = query.get(key)
+        if value in (None, ""):
+            return default
+        try:
+            number = kind(value)
+        except (TypeError, ValueError):
+            raise ControlError(400, f"{key} must be a number, got {value!r}")
+        if number != number or number in (float("inf"), float("-inf")):
+            raise ControlError(400, f"{key} must be a finite number")
+        return number
+
+    def dispatch(self, method: str, route: str, query: dict, body: dict) -> dict:
+        if route == "status" and method == "GET":
+            paths = self.resolve([query["bot"]]) if query.get("bot") else self.known_paths()
+            return {"bots": [self._status(p) for p in paths]}
+        if route == "tail" and method == "GET":
+            if not query.get("bot"):
+                raise ControlError(400, "tail needs ?bot=NAME")
+            path = self.resolve([query["bot"]])[0]
+            store = self.supervisor.log_store(path)
+            # "cursor" is the full-precision index timestamp of the last line;
+            # pass it back as ?since= to get only what was written after it.
+            since = None
+            if query.get("since"):
+                since = self._query_number(query, "since", float)
+                lines = [l for l in store.range(since=since) if l.timestamp > since]
+            else:
+                lines = store.tail(max(1, min(self._query_number(query, "lines", int, 100), 5000)))
+            cursor = lines[-1].timestamp if lines else (since if since is not None else time.time())
+            return {"bot": bot_name(path), "lines": [l._asdict() for l in lines], "cursor": cursor}
+        if route in self.ACTIONS and method == "POST":
+            if body.get("all"):
+                paths = [p for p in state_store().bot_files() if os.path.exists(p)]
+                if route != "start":
+                    paths += [h.path for h in self.supervisor.bots() if h.path not in paths]
+            else:
+                paths = self.resolve([str(b) for b in body.get("bots", [])])
+            if not paths:
+                raise ControlError(400, "No bots given; send {\"bots\": [...]} or {\"all\": true}.")
+            if route == "start":
+                self.supervisor.start_many(paths)
+            elif route == "stop":
+                for p in paths:
+                    self.supervisor.stop(p)
+            else:
+                self.supervisor.restart_all(paths)
+            return {"action": route, "bots": [bot_name(p) for p in paths]}
+        raise ControlError(404, f"No such endpoint: {method} /{route}")
+
+
+class ShellSession(QObject):
+    """One long-lived shell for the command bar.
+
+    Commands are queued and written to the shell's stdin one at a time, each
+    followed by a marker line carrying its exit code, so cd and variables
+    survive between commands and only the first one pays the startup cost.
+    """
+
+    output = Signal(list)
+    command_started = Signal(int, str)
+    command_finished = Signal(int, int)
+
+    _MARKER = re.compile(r"__BM_DONE_(\d+)__ (-?\d+)\s*$")
+    _READY = "__BM_READY__"
+
+    def __init__(self, parent=None, history_size: int = 200):
+        super().__init__(parent)
+        self._proc: QProcess | None = None
+        self._queue: deque[tuple[int, str]] = deque()
+        self._current: tuple[int, str] | None = None
+        # Set once the login profile has run; commands wait for it.
+        self._ready = False
+        # Shell children that existed before the current command started.
+        self._baseline: set[int] = set()
+        self._next_id = 1
+        self._buffer = ""
+        self.history: deque[str] = deque(maxlen=history_size)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close)
+
+    def is_busy(self) -> bool:
+        return self.pending() > 0
+
+    def pending(self) -> int:
+        return len(self._queue) + (1 if self._current else 0)
+
+    def submit(self, command: str) -> int:
+        command = command.strip()
+        if not command:
+            return 0
+        if not self.history or self.history[-1] != command:
+            self.history.append(command)
+        cid = self._next_id
+        self._next_id += 1
+        self._queue.append((cid, command))
+        self._pump()
+        return cid
+
+    def _children(self) -> list:
+        psutil = optional_import("psutil")
+        if psutil is None or self._proc is None:
+            return []
+        try:
+            return psutil.Process(int(self._proc.processId())).children(recursive=True)
+        except Exception:
+            return []
+
+    def cancel(self):
+        # Drops queued commands and kills the running one. Only processes
+        # the command spawned are killed so the shell (and its cwd/variables)
+        # survives; without psutil, or for shell builtins, the shell itself
+        # is killed. Nothing is written before the profile finishes, so
+        # there is no command to kill during startup.
+        self._queue.clear()
+        if self._current is None or self._proc is None:
+            return
+        children = [c for c in self._children() if c.pid not in self._baseline]
+        for child in children:
+            try:
+                child.kill()
+            except Exception:
+                pass
+        if not children:
+            self._proc.kill()
+
+    def close(self):
+        self._queue.clear()
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        proc.closeWriteChannel()
+        if not proc.waitForFinished(1000):
+            proc.kill()
+            proc.waitForFinished(1000)
+
+    def _ensure_shell(self) -> QProcess:
+        if self._proc is not None:
+            return self._proc
+        proc = QProcess(self)
+        if os.name == "nt":
+            proc.setProgram("powershell")
+            proc.setArguments(["-NoLogo", "-Command", "-"])
+        else:
+            proc.setProgram("bash")
+            proc.setArguments(["-l", "-s"])
+        proc.setProcessChannelMode(QProcess.MergedChannels)
+        proc.readyReadStandardOutput.connect(lambda p=proc: self._read(p))
+        proc.finished.connect(lambda code, status, p=proc: self._on_finished(p, code))
+        self._proc = proc
+        self._buffer = ""
+        self._ready = False
+        proc.start()
+        proc.write((f"\"{self._READY}\"\n" if os.name == "nt" else f"echo {self._READY}\n").encode("utf-8"))
+        return proc
+
+    def _wrap(self, cid: int, command: str) -> str:
+        # The command goes through eval/Invoke-Expression as one quoted
+        # string, so a syntax error (e.g. an unbalanced quote) is reported
+        # as a failure instead of swallowing the marker line.
+        marker = f"__BM_DONE_{cid}__"
+        if os.name == "nt":
+            quotes = ("'", "\u2018", "\u2019", "\u201a", "\u201b")
+            lines = []
+            for line in command.splitlines():
+                for q in quotes:
+                    line = line.replace(q, q + q)
+                lines.append(f"'{line}'")
+            quoted = ' + "`n" + '.join(lines)
+            return (f"Invoke-Expression ({quoted})\n"
+                    f"$__bm_ok = $?; \"{marker} \" + $(if ($__bm_ok) {{ 0 }} elseif ($LASTEXITCODE) {{ $LASTEXITCODE }} else {{ 1 }})\n")
+        quoted = (command.replace("\\", "\\\\").replace("'", "\\'")
+                  .replace("\r", "\\r").replace("\n", "\\n"))
+        # stdin comes from /dev/null so a command cannot swallow queued input.
+        return f"eval $'{quoted}' < /dev/null\necho \"{marker} $?\"\n"
+
+    def _pump(self):
+        if self._current is not None or not self._queue:
+            return
+        proc = self._ensure_shell()
+        if not self._ready:
+            return
+        self._current = self._queue.popleft()
+        cid, command = self._current
+        self._baseline = {c.pid for c in self._children()}
+        self.command_started.emit(cid, command)
+        proc.write(self._wrap(cid, command).encode("utf-8"))
+
+    def _read(self, proc: QProcess):
+        if proc is not self._proc:
+            return
+        self._buffer += bytes(proc.readAllStandardOutput()).decode(errors="ignore")
+        *lines, self._buffer = self._buffer.replace("\r\n", "\n").split("\n")
+        out = []
+        for line in lines:
+            if not self._ready and line.strip() == self._READY:
+                self._ready = True
+                continue
+            m = self._MARKER.search(line)
+            if m is None or self._current is None or int(m.group(1)) != self._current[0]:
+                out.append(line)
+                continue
+            head = line[:m.start()]
+            if head.strip():
+                out.append(head)
+            if out:
+                self.output.emit(out)
+                out = []
+            cid = self._current[0]
+            self._current = None
+            self.command_finished.emit(cid, int(m.group(2)))
+        if out:
+            self.output.emit(out)
+        self._pump()
+
+    def _on_finished(self, proc: QProcess, code: int):
+        proc.deleteLater()
+        if proc is not self._proc:
+            return
+        self._proc = None
+        if self._buffer.strip():
+            self.output.emit([self._buffer])
+        self._buffer = ""
+        if self._current is None and not self._ready and self._queue:
+            # The shell exited during startup; fail the command waiting for it.
+            self._current = self._queue.popleft()
+            self.command_started.emit(*self._current)
+        if self._current is not None:
+            cid = self._current[0]
+            self._current = None
+            self.command_finished.emit(cid, code if code else -1)
+        self._pump()
+
+
+def run_headless(argv: list[str] | None = None) -> int:
+    app = QCoreApplication(argv if argv is not None else sys.argv)
+    supervisor = BotSupervisor(app, settings=SETTINGS)
+
+    def on_output(path: str, lines: list, is_error: bool):
+        out = sys.stderr if is_error else sys.stdout
+        prefix = f"[{bot_name(path)}] "
+        out.write("".join(prefix + line + "\n" for line in lines))
+        out.flush()
+
+    supervisor.output.connect(on_output)
+    supervisor.state_changed.connect(lambda path, state: print(f"[{bot_name(path)}] state: {state}", flush=True))
+    supervisor.bot_error.connect(lambda path, err: print(f"[{bot_name(path)}] error: {err}", file=sys.stderr, flush=True))
+
+    paths = [p for p in state_store().bot_files() if os.path.exists(p)]
+    if not paths:
+        print(f"No bots configured in {BOT_DATA_FILE}.", file=sys.stderr)
+    orchestrator = StartupOrchestrator.from_settings(supervisor, paths, SETTINGS, parent=app)
+    QTimer.singleShot(0, orchestrator.start)
+    # Also drives the per-bot memory limit watchdog.
+    sampler = StatusSampler(supervisor, parent=app)
+    sampler.start()
+    metrics = MetricsExporter(supervisor, sampler, parent=app)
+    metrics.failed.connect(lambda msg: print(msg, file=sys.stderr, flush=True))
+    metrics.apply_settings()
+    control = ControlServer(supervisor, parent=app)
+    control.failed.connect(lambda msg: print(msg, file=sys.stderr, flush=True))
+    control.apply_settings()
+
+    shutdown = ShutdownCoordinator(supervisor, parent=app)
+    shutdown.finished.connect(app.quit)
+
+    def request_shutdown(signum, frame):
+        print("Stopping bots…", flush=True)
+        orchestrator.cancel()
+        shutdown.start()
+
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+    # Give the interpreter a chance to run the Python signal handlers.
+    wake = QTimer(app)
+    wake.setInterval(250)
+    wake.timeout.connect(lambda: None)
+    wake.start()
+
+    return app.exec()
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+
+def control_file_path() -> str:
+    # Mirrors bot_core.control_file_path() without importing Qt.
+    override = os.environ.get("BOT_MANAGER_CONTROL_FILE")
+    if override:
+        return override
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "DiscordBotManager", "control.json")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "discord-bot-manager", "control.json")
+
+
+class CliError(Exception):
+    pass
+
+
+class ControlClient:
+    def __init__(self, timeout: float = 20.0):
+        path = control_file_path()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            raise CliError(f"No running Bot Manager found ({path} missing). Is the control API enabled?")
+        self.base = f"http://{info.get('host', '127.0.0.1')}:{info['port']}"
+        self.token = info["token"]
+        self.timeout = timeout
+
+    def request(self, method: str, route: str, query: dict | None = None, body: dict | None = None) -> dict:
+        url = f"{self.base}/{route}"
+        if query:
+            url += "?" + urlencode(query)
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(url, data=data, method=method)
+        req.add_header("Authorization", f"Bearer {self.token}")
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read() or b"{}")
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise CliError(message)
+        except urllib.error.URLError as e:
+            raise CliError(f"Cannot reach the Bot Manager at {self.base}: {e.reason}")
+
+
+def _format_uptime(seconds: float) -> str:
+    seconds = int(seconds or 0)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}"
+
+
+def cmd_status(client: ControlClient, args) -> int:
+    bots = []
+    for name in args.bots or [None]:
+        bots += client.request("GET", "status", {"bot": name} if name else None)["bots"]
+    if args.json:
+        print(json.dumps(bots, indent=2))
+        return 0
+    for b in bots:
+        code = b.get("exit_code")
+        print(f"{b['name']:<24} {b['state']:<10} pid={b.get('pid') or '-':<7} "
+              f"up={_format_uptime(b.get('uptime'))} restarts={b.get('restarts', 0)}"
+              + (f" exit={code}" if code is not None else ""))
+    return 0
+
+
+def cmd_action(client: ControlClient, args) -> int:
+    if not args.all and not args.bots:
+        raise CliError(f"{args.command}: name one or more bots or pass --all")
+    body = {"all": True} if args.all else {"bots": args.bots}
+    result = client.request("POST", args.command, body=body)
+    print(f"{result['action']}: {', '.join(result['bots'])}")
+    return 0
+
+
+def _print_lines(lines: list[dict]):
+    for line in lines:
+        stamp = time.strftime("%H:%M:%S", time.localtime(line["timestamp"]))
+        out = sys.stderr if line["stream"] == "E" else sys.stdout
+        out.write(f"{stamp} {line['text']}\n")
+        out.flush()
+
+
+def cmd_tail(client: ControlClient, args) -> int:
+    result = client.request("GET", "tail", {"bot": args.bot, "lines": args.lines})
+    _print_lines(result["lines"])
+    if not args.follow:
+        return 0
+    cursor = result["cursor"]
+    try:
+        while True:
+            time.sleep(args.interval)
+            result = client.request("GET", "tail", {"bot": args.bot, "since": repr(cursor)})
+            _print_lines(result["lines"])
+            cursor = result["cursor"]
+    except KeyboardInterrupt:
+        return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="bot-manager", description="Control a running Discord Bot Manager.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("status", help="show bot states")
+    p.add_argument("bots", nargs="*", help="bot names or paths (default: all)")
+    p.add_argument("--json", action="store_true", help="print raw JSON")
+    p.set_defaults(func=cmd_status)
+
+    for action in ("start", "stop", "restart"):
+        p = sub.add_parser(action, help=f"{action} bots")
+        p.add_argument("bots", nargs="*", help="bot names or paths")
+        p.add_argument("--all", action="store_true", help=f"{action} every configured bot")
+        p.set_defaults(func=cmd_action)
+
+    p = sub.add_parser("tail", help="print a bot's recent output")
+    p.add_argument("bot", help="bot name or path")
+    p.add_argument("-n", "--lines", type=int, default=100, help="number of lines (default: 100)")
+    p.add_argument("-f", "--follow", action="store_true", help="keep printing new output")
+    p.add_argument("--interval", type=float, default=1.0, help=argparse.SUPPRESS)
+    p.set_defaults(func=cmd_tail)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(ControlClient(), args)
+    except CliError as e:
+        print(f"bot-manager: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
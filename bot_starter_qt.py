@@ -1,5 +1,22 @@
 import sys
-from PySide6.QtCore import Qt, QSize, QEvent, QProcess, QTimer, QEasingCurve, QPoint, QPropertyAnimation
+import time
+
+_STARTUP_T0 = time.perf_counter()
+_STARTUP_MARKS: list[tuple[str, float]] = []
+PROFILE_STARTUP = "--profile-startup" in sys.argv[1:]
+
+
+def startup_mark(label: str):
+    if PROFILE_STARTUP and label not in (m[0] for m in _STARTUP_MARKS):
+        _STARTUP_MARKS.append((label, time.perf_counter()))
+
+
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    # Server mode: supervise bots without QtWidgets, splash or login.
+    from bot_core import run_headless
+    sys.exit(run_headless(sys.argv))
+
+from PySide6.QtCore import Qt, QObject, Signal, QAbstractListModel, QModelIndex, QSize, QEvent, QTimer, QEasingCurve, QPoint, QPropertyAnimation, QRectF
 from PySide6.QtGui import (
     QFont,
     QIcon,
@@ -21,6 +38,7 @@ from PySide6.QtWidgets import (
     QSizePolicy,
     QPushButton,
     QListWidget,
+    QListView,
     QFileDialog,
     QPlainTextEdit,
     QLineEdit,
@@ -29,8 +47,10 @@ from PySide6.QtWidgets import (
     QTextEdit,
     QDialog,
     QInputDialog,
+    QStyledItemDelegate,
 )
 from PySide6.QtWidgets import QProgressBar, QGraphicsOpacityEffect
+startup_mark("import PySide6")
 
 
 COLOR_BG = "#1A1A24"
@@ -42,10 +62,195 @@ COLOR_FG = "white"
 HELP_GRAY = "#8C8C8C"
 HELP_GRAY_HOVER = "#B3B3B3"
 
+THEMES = {
+    "dark": {
+        "bg": COLOR_BG,
+        "fg": COLOR_FG,
+        "accent": COLOR_ACCENT,
+        "btn_bg": COLOR_BTN_BG,
+        "btn_hover": COLOR_BTN_HOVER,
+        "btn_press": COLOR_BTN_PRESS,
+        "disabled_bg": "#30334f",
+        "disabled_fg": "#bbbbbb",
+        "console_bg": "#111119",
+        "error_text": "#ff5555",
+        "muted": "gray",
+        "help": HELP_GRAY,
+        "help_hover": HELP_GRAY_HOVER,
+        "check_border": "#50579E",
+        "check_hover": "#6b73c6",
+        "check_disabled": "#2c2f4a",
+        "subtitle": "#bfc3ff",
+        "banner_bg": "#3a1b1e",
+        "banner_fg": "#ffb3b3",
+        "banner_border": "#7a2b32",
+        "progress_bg": "#222641",
+        "progress_border": "#3d4170",
+        "spark_cpu": "#7FD1FF",
+    },
+    "light": {
+        "bg": "#F4F5FA",
+        "fg": "#1A1A24",
+        "accent": "#8A6D00",
+        "btn_bg": "#DDE0F2",
+        "btn_hover": "#C8CDEE",
+        "btn_press": "#B8BEE6",
+        "disabled_bg": "#E6E7EF",
+        "disabled_fg": "#9A9A9A",
+        "console_bg": "#FFFFFF",
+        "error_text": "#C62828",
+        "muted": "#6E6E6E",
+        "help": "#8C8C8C",
+        "help_hover": "#4F4F4F",
+        "check_border": "#7F86C9",
+        "check_hover": "#5B63B5",
+        "check_disabled": "#D3D5E4",
+        "subtitle": "#4C528F",
+        "banner_bg": "#FDECEE",
+        "banner_fg": "#8A1F2A",
+        "banner_border": "#E3A3AA",
+        "progress_bg": "#E3E5F3",
+        "progress_border": "#C3C7E6",
+        "spark_cpu": "#1F78B4",
+    },
+}
+
+# One application-wide sheet; widgets opt in through their class name or
+# objectName instead of carrying their own setStyleSheet copies.
+_APP_STYLESHEET = """
+QWidget {
+    background-color: $bg;
+    color: $fg;
+}
+QWidget#splash {
+    background: transparent;
+}
+QCheckBox::indicator {
+    width: 18px;
+    height: 18px;
+    border-radius: 4px;
+    border: 1px solid $check_border;
+    background: transparent;
+    margin-right: 6px;
+}
+QCheckBox::indicator:hover {
+    border-color: $check_hover;
+}
+QCheckBox::indicator:checked {
+    background: $btn_hover;
+    border-color: $btn_hover;
+}
+QCheckBox::indicator:disabled {
+    background: transparent;
+    border-color: $check_disabled;
+}
+PillButton {
+    background-color: $btn_bg;
+    color: $fg;
+    border: 1px solid $btn_bg;
+    padding: 6px 14px;
+}
+PillButton:hover {
+    background-color: $btn_hover;
+    border-color: $btn_hover;
+}
+PillButton:pressed {
+    background-color: $btn_press;
+    border-color: $btn_hover;
+}
+PillButton:disabled {
+    background-color: $disabled_bg;
+    color: $disabled_fg;
+    border-color: $disabled_bg;
+}
+BotListView {
+    background-color: $btn_bg;
+    color: $fg;
+    border: none;
+}
+QPlainTextEdit#console {
+    background-color: $console_bg;
+    color: $accent;
+}
+QLineEdit#commandEntry, BotLimitsDialog QLineEdit {
+    background-color: $btn_bg;
+    color: $fg;
+    border: none;
+    padding: 6px;
+}
+QTextEdit#envEdit {
+    background-color: $btn_bg;
+    color: $fg;
+}
+QLabel#errorBanner {
+    background-color: $banner_bg;
+    color: $banner_fg;
+    border: 1px solid $banner_border;
+    border-radius: 8px;
+    padding: 8px;
+}
+QLabel#footer {
+    color: $muted;
+}
+QLabel#helpLabel {
+    color: $help;
+}
+QLabel#helpLabel:hover {
+    color: $help_hover;
+}
+QWidget#card {
+    background-color: $bg;
+    border-radius: 16px;
+}
+QLabel#splashTitle {
+    background: transparent;
+    color: $fg;
+}
+QLabel#splashSubtitle {
+    background: transparent;
+    color: $subtitle;
+}
+QWidget#card QProgressBar {
+    background: $progress_bg;
+    border: 1px solid $progress_border;
+    border-radius: 8px;
+    color: $fg;
+}
+QWidget#card QProgressBar::chunk {
+    background-color: $btn_hover;
+    border-radius: 8px;
+}
+"""
+
+_THEME_SHEETS: dict[str, str] = {}
+_current_theme = "dark"
+
+
+def theme_stylesheet(name: str) -> str:
+    sheet = _THEME_SHEETS.get(name)
+    if sheet is None:
+        sheet = _THEME_SHEETS[name] = Template(_APP_STYLESHEET).substitute(THEMES[name])
+    return sheet
+
+
+def theme_color(key: str) -> str:
+    # For custom-painted widgets that cannot be reached by the stylesheet.
+    return THEMES[_current_theme][key]
+
+
+def current_theme() -> str:
+    return _current_theme
+
+
+def apply_theme(app: QApplication, name: str | None = None):
+    global _current_theme
+    name = name if name in THEMES else "dark"
+    if name == _current_theme and app.styleSheet():
+        return
+    _current_theme = name
+    app.setStyleSheet(theme_stylesheet(name))
+
 
-BOT_DATA_FILE = "bot_manager_data.json"
-TEMP_EXTRACT_DIR = "bot_temp"
-SETTINGS_FILE = "settings.json"
 ICON_CANDIDATES = [
     "app_icon.ico",
     "app.ico",
@@ -55,66 +260,84 @@ ICON_CANDIDATES = [
 ]
 
 import os
-import json
 import shutil
 import sys as _sys
-import dotenv as _dotenv
-import hashlib
-import base64
-import secrets
-import socket
+import queue
 import threading
-import webbrowser
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections import deque
+from string import Template
 from urllib.parse import urlencode, urlparse, parse_qs
-try:
-    import requests
-except Exception:
-    requests = None
 try:
     import winreg as _winreg
 except Exception:
     _winreg = None
-try:
-    import psutil as _psutil
-except Exception:
-    _psutil = None
-try:
-    import GPUtil as _gputil
-except Exception:
-    _gputil = None
 
+from bot_core import (
+    TEMP_EXTRACT_DIR,
+    SETTINGS,
+    BotFolderIndex,
+    BotSupervisor,
+    BotManifest,
+    VenvManager,
+    ResourceHistory,
+    ShellSession,
+    ShutdownCoordinator,
+    MetricsExporter,
+    ControlServer,
+    CachedSessionWorker,
+    CredentialCache,
+    DiscordOAuth,
+    OAuthExchangeWorker,
+    StartupOrchestrator,
+    StatusSampler,
+    StatusSnapshot,
+    STATE_ICONS,
+    STATE_CRASHED,
+    STATE_RUNNING,
+    STATE_STOPPED,
+    STATE_PREPARING,
+    bot_folder,
+    bot_name,
+    IMPORT_TIMINGS,
+    OAUTH_CLIENT_ID,
+    atomic_write_text,
+    optional_import,
+    python_executable,
+    save_settings,
+    state_store,
+    user_cache_dir,
+)
+startup_mark("import modules")
 
-def load_settings():
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {
-        "auto_restart": False,
-        "auto_start_app": False,
-        "auto_start_bots": False,
-        "notifications": True,
-        "cleanup_temp_on_close": False,
-        "env_vars": {},
-        "start_with_windows": False,
-    }
 
+def report_startup_profile():
+    global PROFILE_STARTUP
+    if not PROFILE_STARTUP or not _STARTUP_MARKS:
+        return
+    PROFILE_STARTUP = False
+    lines = ["Startup profile (ms since interpreter start of this module):"]
+    prev = _STARTUP_T0
+    for label, t in _STARTUP_MARKS:
+        lines.append(f"  {label:<24} {(t - _STARTUP_T0) * 1000:8.1f}  (+{(t - prev) * 1000:.1f})")
+        prev = t
+    if IMPORT_TIMINGS:
+        lines.append("Lazy imports:")
+        for name, dt in IMPORT_TIMINGS.items():
+            lines.append(f"  {name:<24} {dt * 1000:8.1f}")
+    print("\n".join(lines), file=sys.stderr, flush=True)
 
-def save_settings(settings: dict):
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-        json.dump(settings, f, indent=4)
 
+GENERATED_ICON_NAME = "app_icon_v1.png"
 
-SETTINGS = load_settings()
 
 def load_app_icon() -> QIcon | None:
     for name in ICON_CANDIDATES:
         p = os.path.join(os.path.dirname(__file__), name)
         if os.path.exists(p):
             return QIcon(p)
+    cached = os.path.join(user_cache_dir(), GENERATED_ICON_NAME)
+    if os.path.exists(cached):
+        return QIcon(cached)
     return None
 
 def _generate_icon_pixmap(size: int = 512) -> QPixmap:
@@ -172,16 +395,27 @@ def _generate_icon_pixmap(size: int = 512) -> QPixmap:
 
 def ensure_generated_icon_files() -> QIcon:
     base_dir = os.path.dirname(__file__)
-    pm = _generate_icon_pixmap(512)
     png_path = os.path.join(base_dir, "app_icon.png")
     ico_path = os.path.join(base_dir, "app_icon.ico")
-    pm.save(png_path, "PNG")
-    
+    cached = os.path.join(user_cache_dir(), GENERATED_ICON_NAME)
+    if os.path.exists(cached):
+        return QIcon(cached)
+    pm = _generate_icon_pixmap(512)
+    if pm.save(png_path, "PNG"):
+        try:
+            pm.save(ico_path, "ICO")
+        except Exception:
+            pass
+        return QIcon(png_path)
+    # Install folder is read-only (e.g. frozen build): keep one rendered copy
+    # in the user cache instead of re-rendering on every launch.
     try:
-        pm.save(ico_path, "ICO")
-    except Exception:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        if pm.save(cached, "PNG"):
+            return QIcon(cached)
+    except OSError:
         pass
-    return QIcon(png_path if os.path.exists(png_path) else ico_path)
+    return QIcon(pm)
 
 def add_to_registry_autostart():
     if os.name != "nt" or _winreg is None:
@@ -202,79 +436,225 @@ def add_to_registry_autostart():
         pass
 
 
+class OAuthCallbackBridge(QObject):
+    code_received = Signal(str)
+    callback_error = Signal(str)
+
+
 class PillButton(QPushButton):
+    # Colours and :hover/:pressed states come from the application sheet;
+    # the widget only carries its pill radius, cached per radius and applied
+    # when it changes, so mouse events never re-parse CSS.
+    _RADIUS_SHEETS: dict[int, str] = {}
+
     def __init__(self, text: str, parent=None):
         super().__init__(text, parent)
         self.setCursor(Qt.PointingHandCursor)
         self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
         self.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
         self.setMinimumSize(120, 36)
-
-        
-        self._bg = COLOR_BTN_BG
-        self._hover = COLOR_BTN_HOVER
-        self._press = COLOR_BTN_PRESS
-        self._fg = COLOR_FG
-
-        
-        self._apply_style(self._bg)
+        self._radius = 0
+        self._apply_radius()
 
     def sizeHint(self) -> QSize:
         sh = super().sizeHint()
         return QSize(max(sh.width() + 16, 120), max(sh.height() + 8, 36))
 
-    def enterEvent(self, e):
-        super().enterEvent(e)
-        self._apply_style(self._hover)
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._apply_radius()
 
-    def leaveEvent(self, e):
-        super().leaveEvent(e)
-        self._apply_style(self._bg)
+    def _apply_radius(self):
+        radius = max(1, int(self.height() / 2))
+        if radius == self._radius:
+            return
+        self._radius = radius
+        sheet = self._RADIUS_SHEETS.get(radius)
+        if sheet is None:
+            sheet = self._RADIUS_SHEETS[radius] = f"border-radius: {radius}px;"
+        self.setStyleSheet(sheet)
 
-    def mousePressEvent(self, e):
-        super().mousePressEvent(e)
-        if e.button() == Qt.LeftButton:
-            self._apply_style(self._press)
 
-    def mouseReleaseEvent(self, e):
-        super().mouseReleaseEvent(e)
-        
-        if self.rect().contains(e.position().toPoint()):
-            
-            self._apply_style(self._hover)
-        else:
-            self._apply_style(self._bg)
+def format_bytes(n: float) -> str:
+    units = ["B", "KB", "MB", "GB", "TB"]
+    i = 0
+    while n >= 1024 and i < len(units) - 1:
+        n /= 1024.0
+        i += 1
+    return f"{n:.1f} {units[i]}"
 
-    def resizeEvent(self, e):
-        super().resizeEvent(e)
-        
-        current_color = self.palette().color(self.backgroundRole()).name() if self.backgroundRole() else self._bg
-        
-        if self.underMouse():
-            current_color = self._hover
-        else:
-            current_color = self._bg
-        self._apply_style(current_color)
 
-    def _apply_style(self, bg_color: str):
-        radius = max(1, int(self.height() / 2))
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {bg_color};
-                color: {self._fg};
-                border: 1px solid {COLOR_BTN_HOVER if bg_color != self._bg else self._bg};
-                border-radius: {radius}px;
-                padding: 6px 14px;
-            }}
-            QPushButton:disabled {{
-                background-color: #30334f;
-                color: #bbbbbb;
-                border-color: #30334f;
-            }}
-        """)
-
-
-class BotListWidget(QListWidget):
+class PathProbe(QObject):
+    # Existence checks can hang on network shares; run them on a few
+    # daemon threads and report back through a queued signal. The folder
+    # key needs an isdir() too, so it is resolved here as well.
+    checked = Signal(str, bool, str)
+
+    def __init__(self, workers: int = 4, parent=None):
+        super().__init__(parent)
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._workers = workers
+        self._threads: list[threading.Thread] = []
+
+    def check(self, paths: list[str]):
+        if not self._threads:
+            for _ in range(self._workers):
+                th = threading.Thread(target=self._run, daemon=True)
+                th.start()
+                self._threads.append(th)
+        for p in paths:
+            self._queue.put(p)
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            try:
+                exists = os.path.exists(path)
+                key = BotFolderIndex.key(path)
+            except Exception:
+                exists, key = False, ""
+            self.checked.emit(path, exists, key)
+
+
+class BotRecord:
+    def __init__(self, path: str, state: str = STATE_STOPPED):
+        self.path = path
+        self.exists: bool | None = None
+        self.folder_key: str | None = None
+        self.state = state
+        self.cpu: float | None = None
+        self.rss: int | None = None
+
+
+class BotListModel(QAbstractListModel):
+    PathRole = Qt.UserRole + 1
+    RecordRole = Qt.UserRole + 2
+
+    def __init__(self, paths: list[str], supervisor: BotSupervisor, parent=None):
+        super().__init__(parent)
+        self._supervisor = supervisor
+        self._index = supervisor.folder_index
+        self._index.changed.connect(self._on_folder_changed)
+        self._records: list[BotRecord] = []
+        self._rows: dict[str, int] = {}
+        self._probe = PathProbe(parent=self)
+        self._probe.checked.connect(self._on_checked)
+        self.add_paths(paths)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._records):
+            return None
+        rec = self._records[index.row()]
+        if role == Qt.DisplayRole:
+            mark = "⚠️ " if rec.exists is False else ""
+            text = f"{STATE_ICONS.get(rec.state, '')} {mark}{rec.path}"
+            if rec.cpu is not None and rec.rss is not None:
+                text += f"  ·  {rec.cpu:.0f}% CPU, {format_bytes(rec.rss)}"
+            return text
+        if role == Qt.ToolTipRole:
+            if rec.exists is False:
+                return f"{rec.path}\nPath not found"
+            return f"{rec.path}\nState: {rec.state}"
+        if role == self.PathRole:
+            return rec.path
+        if role == self.RecordRole:
+            return rec
+        return None
+
+    def paths(self) -> list[str]:
+        return [r.path for r in self._records]
+
+    def existing_paths(self) -> list[str]:
+        return [r.path for r in self._records if r.exists is not False]
+
+    def row_of(self, path: str) -> int:
+        return self._rows.get(path, -1)
+
+    def folder_key(self, path: str) -> str | None:
+        row = self._rows.get(path)
+        return self._records[row].folder_key if row is not None else None
+
+    def _reindex(self, first: int = 0):
+        for i in range(first, len(self._records)):
+            self._rows[self._records[i].path] = i
+
+    def _changed(self, row: int):
+        idx = self.index(row, 0)
+        self.dataChanged.emit(idx, idx)
+
+    def add_paths(self, paths: list[str]):
+        new = []
+        for p in paths:
+            if p and p not in self._rows and p not in new:
+                new.append(p)
+        if not new:
+            return
+        first = len(self._records)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        self._records.extend(BotRecord(p, self._supervisor.state(p)) for p in new)
+        self._reindex(first)
+        self.endInsertRows()
+        # Folders are watched once the probe has seen them exist.
+        self._probe.check(new)
+
+    def remove_row(self, row: int) -> str | None:
+        if not 0 <= row < len(self._records):
+            return None
+        self.beginRemoveRows(QModelIndex(), row, row)
+        rec = self._records.pop(row)
+        del self._rows[rec.path]
+        self._reindex(row)
+        self.endRemoveRows()
+        if rec.folder_key and not self._supervisor.is_running(rec.path):
+            self._index.unwatch(rec.path, rec.folder_key)
+        return rec.path
+
+    def recheck(self):
+        self._probe.check(self.paths())
+
+    def _on_folder_changed(self, folder: str, kind: str):
+        if kind == "folder":
+            self._probe.check([r.path for r in self._records if r.folder_key == folder])
+
+    def _on_checked(self, path: str, exists: bool, key: str):
+        row = self._rows.get(path)
+        if row is None:
+            return
+        rec = self._records[row]
+        if key:
+            rec.folder_key = key
+        if rec.exists == exists:
+            return
+        rec.exists = exists
+        if exists:
+            self._index.watch(path, folder=rec.folder_key)
+        self._changed(row)
+
+    def set_state(self, path: str, state: str):
+        row = self._rows.get(path)
+        if row is None:
+            return
+        rec = self._records[row]
+        rec.state = state
+        if state != STATE_RUNNING:
+            rec.cpu = rec.rss = None
+        self._changed(row)
+
+    def set_metrics(self, snap: StatusSnapshot):
+        for sample in snap.bots:
+            row = self._rows.get(sample.path)
+            if row is None:
+                continue
+            rec = self._records[row]
+            if (rec.cpu, rec.rss) != (sample.cpu, sample.rss):
+                rec.cpu, rec.rss = sample.cpu, sample.rss
+                self._changed(row)
+
+
+class BotListView(QListView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAcceptDrops(True)
@@ -282,9 +662,8 @@ class BotListWidget(QListWidget):
         self.setDropIndicatorShown(True)
         self.setDragDropMode(QAbstractItemView.DropOnly)
         self.setDefaultDropAction(Qt.CopyAction)
-        self.setStyleSheet(
-            f"background-color: {COLOR_BTN_BG}; color: white; border: none;"
-        )
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setUniformItemSizes(True)
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -318,41 +697,169 @@ class BotListWidget(QListWidget):
             super().dropEvent(event)
 
 
+def draw_sparkline(painter: QPainter, rect: QRectF, values: list[float], color: str, fill: bool = True):
+    if len(values) < 2 or rect.width() <= 2 or rect.height() <= 2:
+        return
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or 1.0
+    step = rect.width() / (len(values) - 1)
+    line = QPainterPath()
+    for i, v in enumerate(values):
+        x = rect.left() + i * step
+        y = rect.bottom() - (v - lo) / span * rect.height()
+        if i == 0:
+            line.moveTo(x, y)
+        else:
+            line.lineTo(x, y)
+    painter.save()
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    if fill:
+        area = QPainterPath(line)
+        area.lineTo(rect.right(), rect.bottom())
+        area.lineTo(rect.left(), rect.bottom())
+        area.closeSubpath()
+        shade = QColor(color)
+        shade.setAlpha(50)
+        painter.fillPath(area, shade)
+    painter.setPen(QColor(color))
+    painter.drawPath(line)
+    painter.restore()
+
+
+class SparklineWidget(QWidget):
+    def __init__(self, color_key: str = "accent", parent=None):
+        super().__init__(parent)
+        self._color_key = color_key
+        self._values: list[float] = []
+        self.setMinimumHeight(36)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def set_values(self, values: list[float]):
+        if values != self._values:
+            self._values = values
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(theme_color("console_bg")))
+        draw_sparkline(painter, QRectF(self.rect()).adjusted(3, 4, -3, -4), self._values, theme_color(self._color_key))
+
+
+class BotItemDelegate(QStyledItemDelegate):
+    # Draws a small RSS sparkline on the right-hand side of each bot row.
+    SPARK_WIDTH = 90
+    SPARK_POINTS = 60
+
+    def __init__(self, history: ResourceHistory, parent=None):
+        super().__init__(parent)
+        self._history = history
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        values = self._history.series(index.data(BotListModel.PathRole), "rss", last=self.SPARK_POINTS)
+        if len(values) < 2:
+            return
+        r = option.rect
+        spark = QRectF(r.right() - self.SPARK_WIDTH - 6, r.top() + 3, self.SPARK_WIDTH, r.height() - 6)
+        draw_sparkline(painter, spark, values, theme_color("accent"), fill=False)
+
+
+class ConsoleSink(QObject):
+    # Lines are buffered in one arrival-ordered queue and written once per
+    # frame; per-key counts only cap a runaway bot's share of the queue.
+    def __init__(self, console: QPlainTextEdit, interval_ms: int = 50, max_pending: int = 5000, parent=None):
+        super().__init__(parent)
+        self._console = console
+        self._max_pending = max_pending
+        self._pending: deque[tuple[str, str | None, bool]] = deque()
+        self._counts: dict[str, int] = {}
+        self._dropped_pending: dict[str, int] = {}
+        self.dropped: dict[str, int] = {}
+        self._fmt_out = QTextCharFormat()
+        self._fmt_err = QTextCharFormat()
+        self._theme = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def write(self, key: str, lines: list[str], is_error: bool = False):
+        count = self._counts.get(key, 0)
+        for line in lines:
+            if count >= self._max_pending:
+                if key not in self._dropped_pending:
+                    # Placeholder for the "lines dropped" notice, filled in at flush.
+                    self._pending.append((key, None, True))
+                    self._dropped_pending[key] = 0
+                self._dropped_pending[key] += 1
+                self.dropped[key] = self.dropped.get(key, 0) + 1
+                continue
+            self._pending.append((key, line, is_error))
+            count += 1
+        self._counts[key] = count
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def dropped_total(self) -> int:
+        return sum(self.dropped.values())
+
+    def flush(self):
+        if not self._pending:
+            self._timer.stop()
+            return
+        if self._theme != current_theme():
+            self._theme = current_theme()
+            self._fmt_out.setForeground(QColor(theme_color("accent")))
+            self._fmt_err.setForeground(QColor(theme_color("error_text")))
+        runs: list[tuple[bool, list[str]]] = []
+        pending, self._pending = self._pending, deque()
+        dropped, self._dropped_pending = self._dropped_pending, {}
+        self._counts.clear()
+        for key, line, is_error in pending:
+            prefix = f"[{bot_name(key)}] " if key else ""
+            if line is None:
+                line = f"… {dropped.get(key, 0)} line(s) dropped (output too fast)"
+            if runs and runs[-1][0] == is_error:
+                runs[-1][1].append(prefix + line)
+            else:
+                runs.append((is_error, [prefix + line]))
+
+        doc = self._console.document()
+        cursor = QTextCursor(doc)
+        cursor.movePosition(QTextCursor.End)
+        needs_break = not doc.isEmpty()
+        cursor.beginEditBlock()
+        for is_error, lines in runs:
+            text = "\n".join(lines)
+            cursor.insertText(("\n" if needs_break else "") + text, self._fmt_err if is_error else self._fmt_out)
+            needs_break = True
+        cursor.endEditBlock()
+        bar = self._console.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+
 class BotManagerWindow(QWidget):
-    def __init__(self):
+    def __init__(self, supervisor: BotSupervisor | None = None, sampler: StatusSampler | None = None):
         super().__init__()
         self.setWindowTitle("Bot Manager – py-cord + dotenv (Qt)")
         self.setMinimumSize(900, 850)
-        self.setStyleSheet(
-            f"""
-            QWidget {{
-                background-color: {COLOR_BG};
-                color: {COLOR_FG};
-            }}
-            QCheckBox::indicator {{
-                width: 18px;
-                height: 18px;
-                border-radius: 4px;
-                border: 1px solid #50579E;
-                background: transparent;
-                margin-right: 6px;
-            }}
-            QCheckBox::indicator:hover {{
-                border-color: #6b73c6;
-            }}
-            QCheckBox::indicator:checked {{
-                background: {COLOR_BTN_HOVER};
-                border-color: {COLOR_BTN_HOVER};
-            }}
-            QCheckBox::indicator:disabled {{
-                background: transparent;
-                border-color: #2c2f4a;
-            }}
-            """
-        )
 
-        self.bot_files = self._load_bots()
-        self.process: QProcess | None = None
+        self.supervisor = supervisor if supervisor is not None else BotSupervisor(self, settings=SETTINGS)
+        self.folder_index = self.supervisor.folder_index
+        self.folder_index.changed.connect(self._on_folder_changed)
+        self.bot_model = BotListModel(self._load_bots(), self.supervisor, self)
+        self.supervisor.state_changed.connect(self._on_bot_state_changed)
+        self.supervisor.output.connect(self._on_bot_output)
+        self.supervisor.bot_finished.connect(self._on_bot_finished)
+        self.supervisor.bot_error.connect(self._on_bot_error)
+        self.supervisor.restart_scheduled.connect(self._on_restart_scheduled)
+        self.supervisor.bot_parked.connect(self._on_bot_parked)
+        state_store().write_failed.connect(lambda path, err: self._show_error_banner(f"Could not save {path}: {err}"))
+        self._install_owner: dict[str, str] = {}
+        installs = self.supervisor.installs
+        installs.job_added.connect(self._on_install_added)
+        installs.job_output.connect(self._on_install_output)
+        installs.job_progress.connect(self._update_install_label)
+        installs.job_finished.connect(self._on_install_finished)
 
         root = QVBoxLayout(self)
         root.setContentsMargins(12, 12, 12, 12)
@@ -365,6 +872,8 @@ class BotManagerWindow(QWidget):
             ("❌ Remove", self.remove_bot_file),
             ("💾 Save", self.save_bots),
             ("📦 Install requirements", self.install_requirements),
+            ("📦 Install all", self.install_all_requirements),
+            ("✖ Cancel install", self.cancel_install),
         ]:
             btn = PillButton(text)
             btn.clicked.connect(handler)
@@ -373,10 +882,25 @@ class BotManagerWindow(QWidget):
         root.addLayout(top)
 
         
-        self.list_widget = BotListWidget(self)
-        self.list_widget.itemSelectionChanged.connect(self.on_select)
+        self.list_widget = BotListView(self)
+        self.list_widget.setModel(self.bot_model)
+        self.list_widget.selectionModel().selectionChanged.connect(lambda *_: self.on_select())
         root.addWidget(self.list_widget)
-        self.refresh_list()
+
+        history_row = QHBoxLayout()
+        self.history_resolution = "raw"
+        self.lbl_hist_cpu = QLabel("CPU —")
+        self.spark_cpu = SparklineWidget("spark_cpu")
+        self.lbl_hist_rss = QLabel("RAM —")
+        self.spark_rss = SparklineWidget("accent")
+        self.btn_hist_range = PillButton("Range: live")
+        self.btn_hist_range.clicked.connect(self._cycle_history_range)
+        history_row.addWidget(self.lbl_hist_cpu)
+        history_row.addWidget(self.spark_cpu, stretch=1)
+        history_row.addWidget(self.lbl_hist_rss)
+        history_row.addWidget(self.spark_rss, stretch=1)
+        history_row.addWidget(self.btn_hist_range)
+        root.addLayout(history_row)
 
         
         info = QHBoxLayout()
@@ -385,31 +909,44 @@ class BotManagerWindow(QWidget):
         reload_btn = PillButton("🔁 Load token from .env")
         reload_btn.clicked.connect(self.load_token_preview)
         info.addStretch(1)
+        for text, handler in [
+            ("📜 Show log", self.show_bot_log),
+            ("🔎 Search log", self.search_bot_log),
+            ("⚙ Limits", self.edit_bot_limits),
+        ]:
+            btn = PillButton(text)
+            btn.clicked.connect(handler)
+            info.addWidget(btn)
         info.addWidget(reload_btn)
         root.addLayout(info)
 
     
         self.console = QPlainTextEdit()
         self.console.setReadOnly(True)
-        self.console.setStyleSheet(f"background-color: #111119; color: {COLOR_ACCENT};")
+        self.console.setObjectName("console")
         self.console.setMaximumBlockCount(5000)
+        self.console_sink = ConsoleSink(self.console, parent=self)
         root.addWidget(self.console, stretch=1)
 
         
         self.error_banner = QLabel("")
         self.error_banner.setVisible(False)
         self.error_banner.setWordWrap(True)
-        self.error_banner.setStyleSheet(
-            "background-color: #3a1b1e; color: #ffb3b3; "
-            "border: 1px solid #7a2b32; border-radius: 8px; padding: 8px;"
-        )
+        self.error_banner.setObjectName("errorBanner")
         root.addWidget(self.error_banner)
 
         
         self.command_entry = QLineEdit()
-        self.command_entry.setPlaceholderText("Enter a PowerShell command and press Enter…")
-        self.command_entry.returnPressed.connect(self.run_powershell_command)
-        self.command_entry.setStyleSheet(f"background-color: {COLOR_BTN_BG}; color: white; border: none; padding: 6px;")
+        self.command_entry.setPlaceholderText(
+            f"Enter a {'PowerShell' if os.name == 'nt' else 'shell'} command and press Enter… (↑/↓ history, Esc cancels)")
+        self.command_entry.returnPressed.connect(self.run_shell_command)
+        self.command_entry.installEventFilter(self)
+        self._history_pos: int | None = None
+        self.shell = ShellSession(self)
+        self.shell.output.connect(lambda lines: self.console_sink.write("", lines))
+        self.shell.command_started.connect(self._on_shell_started)
+        self.shell.command_finished.connect(self._on_shell_finished)
+        self.command_entry.setObjectName("commandEntry")
         root.addWidget(self.command_entry)
 
         
@@ -417,6 +954,10 @@ class BotManagerWindow(QWidget):
         for text, handler in [
             ("▶️ Start bot", self.start_bot),
             ("⏹ Stop bot", self.stop_bot),
+            ("🔁 Restart bot", self.restart_bot),
+            ("⏯ Start all", self.start_all_bots),
+            ("⏹ Stop all", self.stop_all_bots),
+            ("🔁 Restart all", self.restart_all_bots),
             ("🧹 Clean temp", self.cleanup_temp),
         ]:
             b = PillButton(text)
@@ -431,35 +972,29 @@ class BotManagerWindow(QWidget):
         self.lbl_ram = QLabel("RAM: —")
         self.lbl_gpu = QLabel("GPU: —")
         self.lbl_bot = QLabel("Bot: —")
-        for w in [self.lbl_net, self.lbl_cpu, self.lbl_ram, self.lbl_gpu, self.lbl_bot]:
+        self.lbl_install = QLabel("Installs: —")
+        for w in [self.lbl_net, self.lbl_cpu, self.lbl_ram, self.lbl_gpu, self.lbl_bot, self.lbl_install]:
             status.addWidget(w)
             status.addSpacing(12)
         status.addStretch(1)
         root.addLayout(status)
 
-        self._ps_proc = None
-        self.status_timer = QTimer(self)
-        self.status_timer.setInterval(1500)
-        self.status_timer.timeout.connect(self.update_status)
-        self.status_timer.start()
+        self.sampler = sampler
+        if self.sampler is None:
+            self.sampler = StatusSampler(self.supervisor, parent=self)
+        self.list_widget.setItemDelegate(BotItemDelegate(self.sampler.history, self.list_widget))
+        self.sampler.snapshot_ready.connect(self.update_status)
+        if self.sampler.latest is not None:
+            self.update_status(self.sampler.latest)
+        if not self.sampler.isRunning():
+            self.sampler.start()
     
     
     def append_console(self, text: str):
-        self.console.appendPlainText(text)
-        self.console.ensureCursorVisible()
+        self.console_sink.write("", text.splitlines() or [""])
 
     def append_console_error(self, text: str):
-        cursor = self.console.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor("#ff5555"))
-        cursor.setCharFormat(fmt)
-        cursor.insertText(text + "\n")
-        
-        fmt.setForeground(QColor(COLOR_ACCENT))
-        cursor.setCharFormat(fmt)
-        self.console.setTextCursor(cursor)
-        self.console.ensureCursorVisible()
+        self.console_sink.write("", text.splitlines() or [""], True)
 
     def _show_error_banner(self, message: str):
         self.error_banner.setText("⚠ " + message)
@@ -470,75 +1005,81 @@ class BotManagerWindow(QWidget):
         self.error_banner.setVisible(False)
 
     def selected_path(self) -> str | None:
-        items = self.list_widget.selectedItems()
-        return items[0].text() if items else None
+        rows = self.list_widget.selectionModel().selectedRows()
+        return rows[0].data(BotListModel.PathRole) if rows else None
 
     def _load_bots(self):
-        if os.path.exists(BOT_DATA_FILE):
-            try:
-                with open(BOT_DATA_FILE, "r", encoding="utf-8") as f:
-                    return json.load(f).get("bot_files", [])
-            except Exception:
-                pass
-        return []
+        return state_store().bot_files()
+
+    def _on_bot_state_changed(self, path: str, state: str):
+        self.bot_model.set_state(path, state)
 
-    def refresh_list(self):
-        self.list_widget.clear()
-        for p in self.bot_files:
-            mark = "⚠️ " if not os.path.exists(p) else ""
-            self.list_widget.addItem(f"{mark}{p}")
+    def _on_folder_changed(self, folder: str, kind: str):
+        sel = self.selected_path()
+        if kind == "env" and sel and self.bot_model.folder_key(sel) == folder:
+            self.load_token_preview()
 
     def handle_drop_paths(self, paths: list[str]):
-        for p in paths:
-            if p not in self.bot_files:
-                self.bot_files.append(p)
-        self.refresh_list()
+        self.bot_model.add_paths(paths)
 
     
     def add_bot_file(self):
         files, _ = QFileDialog.getOpenFileNames(self, "Bot-Dateien oder Ordner wählen")
-        for p in files:
-            if p not in self.bot_files:
-                self.bot_files.append(p)
-        self.refresh_list()
+        self.bot_model.add_paths(files)
 
     def remove_bot_file(self):
-        items = self.list_widget.selectedItems()
-        if not items:
+        rows = self.list_widget.selectionModel().selectedRows()
+        if not rows:
             return
-        idx = self.list_widget.row(items[0])
-        del self.bot_files[idx]
-        self.refresh_list()
+        path = self.bot_model.remove_row(rows[0].row())
+        if path:
+            self.supervisor.forget(path)
+            self.sampler.history.forget(path)
 
     def save_bots(self):
-        try:
-            with open(BOT_DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump({"bot_files": self.bot_files}, f, indent=4)
-            QMessageBox.information(self, "Saved", "Bot list saved.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Could not save:\n{e}")
+        state_store().set_bot_files(self.bot_model.paths())
+        QMessageBox.information(self, "Saved", "Bot list saved.")
 
     def on_select(self):
         self.load_token_preview()
+        self._refresh_history()
+
+    _HISTORY_RANGES = {"raw": "live", "1m": "1 min", "1h": "1 h"}
+
+    def _cycle_history_range(self):
+        order = list(self._HISTORY_RANGES)
+        self.history_resolution = order[(order.index(self.history_resolution) + 1) % len(order)]
+        self.btn_hist_range.setText(f"Range: {self._HISTORY_RANGES[self.history_resolution]}")
+        self._refresh_history()
+
+    def _refresh_history(self):
+        sel = self.selected_path()
+        history = self.sampler.history if getattr(self, "sampler", None) is not None else None
+        if not sel or history is None:
+            cpu, rss = [], []
+        else:
+            cpu = history.series(sel, "cpu", self.history_resolution)
+            rss = history.series(sel, "rss", self.history_resolution)
+        self.spark_cpu.set_values(cpu)
+        self.spark_rss.set_values(rss)
+        if cpu:
+            self.lbl_hist_cpu.setText(f"CPU {cpu[-1]:.0f}% (max {max(cpu):.0f}%)")
+            self.lbl_hist_rss.setText(f"RAM {self._fmt_bytes(rss[-1])} (max {self._fmt_bytes(max(rss))})")
+        else:
+            self.lbl_hist_cpu.setText("CPU —")
+            self.lbl_hist_rss.setText("RAM —")
 
     def load_token_preview(self):
         sel = self.selected_path()
         if not sel:
             self.token_label.setText("Token: —")
             return
-        path = sel.replace("⚠️ ", "")
-        folder = path if os.path.isdir(path) else os.path.dirname(path)
-        dotenv_path = os.path.join(folder, ".env")
-        if os.path.exists(dotenv_path):
-            try:
-                vals = _dotenv.dotenv_values(dotenv_path)
-                token = vals.get("DISCORD_TOKEN") or vals.get("TOKEN")
-                if token:
-                    masked = token[:4] + "●" * max(0, len(token) - 8) + token[-4:]
-                    self.token_label.setText("Token: " + masked)
-                    return
-            except Exception:
-                pass
+        folder = bot_folder(sel)
+        token = self.folder_index.token(sel)
+        if token:
+            masked = token[:4] + "●" * max(0, len(token) - 8) + token[-4:]
+            self.token_label.setText("Token: " + masked)
+            return
         enc = SETTINGS.get("encrypted_tokens", {}).get(folder)
         if enc:
             self.token_label.setText("Token: (verschlüsselt)")
@@ -550,27 +1091,20 @@ class BotManagerWindow(QWidget):
         if not sel:
             QMessageBox.warning(self, "Warning", "Please select a bot project.")
             return
-        path = sel.replace("⚠️ ", "")
-        folder = path if os.path.isdir(path) else os.path.dirname(path)
+        folder = bot_folder(sel)
         dotenv_path = os.path.join(folder, ".env")
         token = self.token_input.text()
         if not token:
             QMessageBox.warning(self, "Warning", "Please enter a token.")
             return
         try:
-            with open(dotenv_path, "w", encoding="utf-8") as f:
-                f.write(f"DISCORD_TOKEN={token}")
+            atomic_write_text(dotenv_path, f"DISCORD_TOKEN={token}")
             QMessageBox.information(self, "Saved", "Token saved.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Could not save token:\n{e}")
 
     def _python_executable(self) -> str:
-        if getattr(_sys, "frozen", False):
-            py = shutil.which("python") or shutil.which("python3")
-            if not py:
-                raise RuntimeError("Python nicht gefunden. Bots können nicht gestartet werden.")
-            return py
-        return _sys.executable
+        return python_executable()
 
     
     def start_bot(self):
@@ -578,77 +1112,112 @@ class BotManagerWindow(QWidget):
         if not sel:
             QMessageBox.warning(self, "Warning", "Please select a bot project.")
             return
-        path = sel.replace("⚠️ ", "")
-        folder = path if os.path.isdir(path) else os.path.dirname(path)
+        if self.supervisor.is_running(sel):
+            self.append_console(f"ℹ️ {bot_name(sel)} is already running.")
+            return
+        self._clear_error_banner()
         try:
-            py_files = [f for f in os.listdir(folder) if f.endswith('.py')]
-        except Exception as e:
+            self.supervisor.start(sel)
+        except OSError as e:
             QMessageBox.critical(self, "Error", f"Could not read folder:\n{e}")
             return
-        if not py_files:
-            QMessageBox.critical(self, "Error", "No Python (.py) file found in the folder!")
+        except RuntimeError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        if self.supervisor.state(sel) == STATE_PREPARING:
+            self.append_console(f"📦 {bot_name(sel)}: preparing virtualenv…")
             return
-        main_py = os.path.join(folder, py_files[0])
+        handle = self.supervisor.bot(sel)
+        self.append_console(f"▶️ Starting bot: {os.path.basename(handle.script)}")
 
-        
-        self.stop_bot()
-        self._clear_error_banner()
+    def stop_bot(self):
+        sel = self.selected_path()
+        if sel and self.supervisor.state(sel) not in (STATE_STOPPED, STATE_CRASHED):
+            self.supervisor.stop(sel)
+            self.append_console(f"⏹ Stopping {bot_name(sel)}…")
 
-        self.append_console(f"▶️ Starting bot: {os.path.basename(main_py)}")
-        self.process = QProcess(self)
-        self.process.setProgram(self._python_executable())
-        self.process.setArguments([main_py])
-        self.process.setWorkingDirectory(folder)
-        self.process.setProcessChannelMode(QProcess.SeparateChannels)
-        self.process.readyReadStandardOutput.connect(self._read_output)
-        self.process.readyReadStandardError.connect(self._read_error)
-        self.process.finished.connect(self._on_bot_finished)
-        self.process.errorOccurred.connect(self._on_bot_error)
-        self.process.start()
-
-    def _read_output(self):
-        if not self.process:
+    def restart_bot(self):
+        sel = self.selected_path()
+        if not sel:
+            QMessageBox.warning(self, "Warning", "Please select a bot project.")
             return
-        data = self.process.readAllStandardOutput()
-        try:
-            text = bytes(data).decode(errors='ignore')
-        except Exception:
-            text = str(data)
-        for line in text.splitlines():
-            if line.strip():
-                self.append_console(line)
-
-    def _on_bot_finished(self, code, status):
-        self.append_console(f"⏹ Bot exited (code {code}).")
-        if code not in (0, None):
-            self._show_error_banner(f"Bot crashed or exited with code {code}. Check errors above.")
-        self.process = None
-
-    def _on_bot_error(self, err):
-        msg = f"✖ Bot process error: {err}"
+        self._clear_error_banner()
+        self.append_console(f"🔁 Restarting {bot_name(sel)}…")
+        self.supervisor.restart(sel)
+
+    def start_all_bots(self):
+        self._clear_error_banner()
+        paths = self.bot_model.existing_paths()
+        self.append_console(f"⏯ Starting {len(paths)} bot(s)…")
+        self.supervisor.start_many(paths)
+
+    def stop_all_bots(self):
+        if self.supervisor.running_count():
+            self.append_console(f"⏹ Stopping {self.supervisor.running_count()} bot(s)…")
+        self.supervisor.stop_all()
+
+    def restart_all_bots(self):
+        self._clear_error_banner()
+        paths = self.bot_model.existing_paths()
+        self.append_console(f"🔁 Restarting {len(paths)} bot(s)…")
+        self.supervisor.restart_all(paths)
+
+    def _on_bot_output(self, path: str, lines: list, is_error: bool):
+        self.console_sink.write(path, lines, is_error)
+        if is_error and lines:
+            self._show_error_banner(f"[{bot_name(path)}] {lines[-1]}")
+
+    def _on_bot_finished(self, path: str, code: int):
+        self.append_console(f"⏹ {bot_name(path)} exited (code {code}).")
+        if self.supervisor.state(path) == STATE_CRASHED:
+            self._show_error_banner(f"{bot_name(path)} crashed or exited with code {code}. Check errors above.")
+
+    def _on_restart_scheduled(self, path: str, delay: float):
+        self.append_console(f"⏳ {bot_name(path)} will be restarted in {delay:.1f}s.")
+
+    def _on_bot_parked(self, path: str, code: int):
+        msg = f"{bot_name(path)} keeps crashing (code {code}); auto-restart paused. Start it manually once fixed."
+        self.append_console_error("⛔ " + msg)
+        self._show_error_banner(msg)
+
+    def _on_bot_error(self, path: str, err: str):
+        msg = f"✖ {bot_name(path)} process error: {err}"
         self.append_console_error(msg)
         self._show_error_banner(msg)
 
-    def _read_error(self):
-        data = self.process.readAllStandardError()
-        try:
-            text = bytes(data).decode(errors='ignore')
-        except Exception:
-            text = str(data)
-        for line in text.splitlines():
-            if line.strip():
-                self.append_console_error(line)
-        
-        lines = [l for l in text.splitlines() if l.strip()]
-        if lines:
-            self._show_error_banner(lines[-1])
+    def _show_log_lines(self, path: str, title: str, lines: list):
+        self.console.clear()
+        self.append_console(title)
+        for line in lines:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(line.timestamp))
+            self.console_sink.write(path, [f"{stamp}  {line.text}"], line.is_error)
 
+    def show_bot_log(self):
+        sel = self.selected_path()
+        if not sel:
+            QMessageBox.warning(self, "Warning", "Please select a bot project.")
+            return
+        lines = self.supervisor.log_store(sel).tail(1000)
+        self._show_log_lines(sel, f"📜 Last {len(lines)} log line(s) of {bot_name(sel)}:", lines)
 
-    def stop_bot(self):
-        if self.process and self.process.state() != QProcess.NotRunning:
-            self.process.terminate()
-            self.append_console("⏹ Bot stopped.")
-            self.process = None
+    def search_bot_log(self):
+        sel = self.selected_path()
+        if not sel:
+            QMessageBox.warning(self, "Warning", "Please select a bot project.")
+            return
+        text, ok = QInputDialog.getText(self, "Search log", f"Search the log of {bot_name(sel)} for:")
+        if not ok or not text.strip():
+            return
+        lines = self.supervisor.log_store(sel).search(text.strip())
+        self._show_log_lines(sel, f"🔎 {len(lines)} match(es) for “{text.strip()}” in {bot_name(sel)}:", lines)
+
+    def edit_bot_limits(self):
+        sel = self.selected_path()
+        if not sel:
+            QMessageBox.warning(self, "Warning", "Please select a bot project.")
+            return
+        if BotLimitsDialog(self.supervisor, sel, self).exec() == QDialog.Accepted and self.supervisor.is_running(sel):
+            self.append_console(f"ℹ️ New limits for {bot_name(sel)} apply from the next start.")
 
     def cleanup_temp(self):
         try:
@@ -668,142 +1237,162 @@ class BotManagerWindow(QWidget):
         if not sel:
             QMessageBox.warning(self, "Fehler", "Bitte wähle ein Bot-Projekt aus.")
             return
-        folder = sel.replace("⚠️ ", "")
-        if not os.path.isdir(folder):
-            folder = os.path.dirname(folder)
-        req_path = os.path.join(folder, "requirements.txt")
-        if not os.path.exists(req_path):
+        if not self.folder_index.requirements_path(sel):
             QMessageBox.information(self, "Info", "No requirements.txt found.")
             return
+        for key in self.supervisor.install_requirements([sel]):
+            self._install_owner[key] = sel
 
-        self.append_console("📦 Installing requirements...")
-        proc = QProcess(self)
-        proc.setProgram(self._python_executable())
-        proc.setArguments(["-m", "pip", "install", "-r", req_path])
-        proc.setProcessChannelMode(QProcess.MergedChannels)
-        proc.readyReadStandardOutput.connect(lambda: self.append_console(bytes(proc.readAllStandardOutput()).decode(errors='ignore')))
-        proc.finished.connect(lambda c, s: QMessageBox.information(self, "Done", "Installed requirements.txt.") if c == 0 else QMessageBox.critical(self, "Error", "Installation failed."))
-        proc.start()
+    def install_all_requirements(self):
+        keys = self.supervisor.install_requirements(self.bot_model.existing_paths())
+        if not keys:
+            QMessageBox.information(self, "Info", "No requirements.txt found in any bot.")
+            return
+        self.append_console(f"📦 Queued {len(keys)} install job(s) for all bots.")
+
+    def cancel_install(self):
+        installs = self.supervisor.installs
+        sel = self.selected_path()
+        if sel:
+            keys = [k for k, p in self._install_owner.items() if p == sel and installs.job(k)]
+            venv_key = self.supervisor.bot(sel).venv_key
+            if venv_key and installs.job(VenvManager.job_key(venv_key)) and VenvManager.job_key(venv_key) not in keys:
+                keys.append(VenvManager.job_key(venv_key))
+            if keys:
+                for key in keys:
+                    installs.cancel(key)
+                return
+        others = [j.key for j in installs.jobs()]
+        if not others:
+            QMessageBox.information(self, "Info", "No installs are queued or running.")
+            return
+        msg = (f"{bot_name(sel)} has no install job. " if sel else "") + f"Cancel all {len(others)} install job(s)?"
+        if QMessageBox.question(self, "Cancel installs", msg) == QMessageBox.Yes:
+            for key in others:
+                installs.cancel(key)
+
+    def _on_install_added(self, key: str, title: str):
+        self.append_console(f"📦 Queued: {title}")
+        self._update_install_label()
+
+    def _on_install_output(self, key: str, lines: list):
+        if key.startswith("venv:") and any(h.venv_key == key[5:] for h in self.supervisor.bots()):
+            return  # already shown per bot by the supervisor
+        self.console_sink.write("", [f"[{key}] {l}" for l in lines])
+
+    def _on_install_finished(self, key: str, ok: bool, msg: str):
+        self._install_owner.pop(key, None)
+        if ok:
+            self.append_console(f"✔ {key}: installed.")
+        else:
+            self.append_console_error(f"✖ {key}: {msg}")
+            self._show_error_banner(f"Installation {key} failed: {msg}")
+        self._update_install_label()
+
+    def _update_install_label(self, *_):
+        jobs = self.supervisor.installs.jobs()
+        if not jobs:
+            self.lbl_install.setText("Installs: —")
+            return
+        running = [j for j in jobs if j.state == "running"]
+        parts = [f"{j.title} {j.progress()}%" for j in running[:2]]
+        queued = len(jobs) - len(running)
+        self.lbl_install.setText("Installs: " + ", ".join(parts) + (f" (+{queued} queued)" if queued else ""))
 
     
-    def run_powershell_command(self):
+    def run_shell_command(self):
         cmd = self.command_entry.text().strip()
         if not cmd:
             return
+        self.command_entry.clear()
+        self._history_pos = None
+        if self.shell.is_busy():
+            self.append_console(f"⏳ Queued: {cmd}")
+        self.shell.submit(cmd)
 
+    def _on_shell_started(self, cid: int, cmd: str):
         self.append_console(f"> {cmd}")
-        self.command_entry.clear()
 
-       
-        self.ps_proc = QProcess(self)
-        if os.name == 'nt':
-            self.ps_proc.setProgram("powershell")
-            self.ps_proc.setArguments(["-Command", cmd])
-        else:
-            self.ps_proc.setProgram("bash")
-            self.ps_proc.setArguments(["-lc", cmd])
-        self.ps_proc.setProcessChannelMode(QProcess.MergedChannels)
-        self.ps_proc.readyReadStandardOutput.connect(lambda: self.append_console(bytes(self.ps_proc.readAllStandardOutput()).decode(errors='ignore')))
-        self.ps_proc.finished.connect(lambda c, s: self.append_console(f"✔ Command finished (code {c})."))
-        self.ps_proc.start()
+    def _on_shell_finished(self, cid: int, code: int):
+        self.append_console(f"✔ Command finished (code {code}).")
+
+    def cancel_shell_command(self):
+        if self.shell.pending():
+            self.shell.cancel()
+            self.append_console("✖ Command cancelled.")
+
+    def eventFilter(self, obj, event):
+        if obj is self.command_entry and event.type() == QEvent.KeyPress:
+            key = event.key()
+            if key == Qt.Key_Escape:
+                self.cancel_shell_command()
+                return True
+            if key in (Qt.Key_Up, Qt.Key_Down):
+                self._browse_history(-1 if key == Qt.Key_Up else 1)
+                return True
+        return super().eventFilter(obj, event)
+
+    def _browse_history(self, step: int):
+        history = self.shell.history
+        if not history:
+            return
+        pos = len(history) if self._history_pos is None else self._history_pos
+        pos = max(0, min(len(history), pos + step))
+        self._history_pos = pos
+        self.command_entry.setText(history[pos] if pos < len(history) else "")
 
     def _fmt_bytes(self, n: float) -> str:
-        units = ["B", "KB", "MB", "GB", "TB"]
-        i = 0
-        while n >= 1024 and i < len(units) - 1:
-            n /= 1024.0
-            i += 1
-        return f"{n:.1f} {units[i]}"
-
-    def _internet_ok(self) -> bool:
-        try:
-            socket.create_connection(("1.1.1.1", 53), timeout=1).close()
-            return True
-        except Exception:
-            return False
+        return format_bytes(n)
 
-    def update_status(self):
-        net = "OK" if self._internet_ok() else "Offline"
-        self.lbl_net.setText(f"Net: {net}")
+    def update_status(self, snap: StatusSnapshot):
+        self.bot_model.set_metrics(snap)
+        self._refresh_history()
+        if snap.net_ok is None:
+            self.lbl_net.setText("Net: —")
+        else:
+            self.lbl_net.setText(f"Net: {'OK' if snap.net_ok else 'Offline'}")
 
-        if _psutil is not None:
-            try:
-                cpu = _psutil.cpu_percent(interval=None)
-                vm = _psutil.virtual_memory()
-                self.lbl_cpu.setText(f"CPU: {cpu:.0f}%")
-                self.lbl_ram.setText(f"RAM: {vm.percent:.0f}% ({self._fmt_bytes(vm.used)}/{self._fmt_bytes(vm.total)})")
-            except Exception:
-                self.lbl_cpu.setText("CPU: —")
-                self.lbl_ram.setText("RAM: —")
+        if snap.cpu is not None:
+            self.lbl_cpu.setText(f"CPU: {snap.cpu:.0f}%")
         else:
             self.lbl_cpu.setText("CPU: —")
+        if None not in (snap.ram_percent, snap.ram_used, snap.ram_total):
+            self.lbl_ram.setText(f"RAM: {snap.ram_percent:.0f}% ({self._fmt_bytes(snap.ram_used)}/{self._fmt_bytes(snap.ram_total)})")
+        else:
             self.lbl_ram.setText("RAM: —")
 
-        if _gputil is not None:
-            try:
-                gpus = _gputil.getGPUs()
-                if gpus:
-                    g = gpus[0]
-                    self.lbl_gpu.setText(f"GPU: {g.load*100:.0f}% ({int(g.memoryUsed)}MB/{int(g.memoryTotal)}MB)")
-                else:
-                    self.lbl_gpu.setText("GPU: —")
-            except Exception:
-                self.lbl_gpu.setText("GPU: —")
+        if snap.gpu is not None:
+            g = snap.gpu
+            self.lbl_gpu.setText(f"GPU: {g.load*100:.0f}% ({int(g.memory_used)}MB/{int(g.memory_total)}MB)")
         else:
             self.lbl_gpu.setText("GPU: —")
 
-        if _psutil is not None and self.process and self.process.state() != QProcess.NotRunning:
-            try:
-                pid = int(self.process.processId())
-                if pid and (self._ps_proc is None or self._ps_proc.pid != pid):
-                    self._ps_proc = _psutil.Process(pid)
-                    try:
-                        self._ps_proc.cpu_percent(interval=None)
-                    except Exception:
-                        pass
-                if self._ps_proc is not None:
-                    p_cpu = self._ps_proc.cpu_percent(interval=None)
-                    p_mem = self._ps_proc.memory_info().rss
-                    self.lbl_bot.setText(f"Bot: {p_cpu:.0f}% CPU, {self._fmt_bytes(p_mem)} RAM")
-                else:
-                    self.lbl_bot.setText("Bot: —")
-            except Exception:
-                self.lbl_bot.setText("Bot: —")
+        running = self.supervisor.running_count()
+        sel = self.selected_path()
+        sample = snap.bot(sel) if sel else None
+        if sample is not None and sample.cpu is not None and self.supervisor.is_running(sel):
+            self.lbl_bot.setText(f"Bot: {sample.cpu:.0f}% CPU, {self._fmt_bytes(sample.rss)} RAM · {running} running")
         else:
-            self.lbl_bot.setText("Bot: —")
+            self.lbl_bot.setText(f"Bot: — · {running} running")
 
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Discord Bot Manager (Beta)")
         self.setMinimumSize(800, 650)
-        self.setStyleSheet(
-            f"""
-            QWidget {{
-                background-color: {COLOR_BG};
-                color: {COLOR_FG};
-            }}
-            QCheckBox::indicator {{
-                width: 18px;
-                height: 18px;
-                border-radius: 4px;
-                border: 1px solid #50579E;
-                background: transparent;
-                margin-right: 6px;
-            }}
-            QCheckBox::indicator:hover {{
-                border-color: #6b73c6;
-            }}
-            QCheckBox::indicator:checked {{
-                background: {COLOR_BTN_HOVER};
-                border-color: {COLOR_BTN_HOVER};
-            }}
-            QCheckBox::indicator:disabled {{
-                background: transparent;
-                border-color: #2c2f4a;
-            }}
-            """
-        )
+        self.supervisor = BotSupervisor(self, settings=SETTINGS)
+        self.sampler = StatusSampler(self.supervisor, parent=self)
+        # Started up front: its snapshots also drive the per-bot RSS watchdog,
+        # which must run even if the bot manager window is never opened.
+        self.sampler.start()
+        self.metrics = MetricsExporter(self.supervisor, self.sampler, parent=self)
+        self.metrics.failed.connect(self._on_service_failed)
+        self.metrics.apply_settings()
+        self.control = ControlServer(self.supervisor, parent=self)
+        self.control.failed.connect(self._on_service_failed)
+        self.control.apply_settings()
+        self._shutdown: ShutdownCoordinator | None = None
+        QApplication.instance().aboutToQuit.connect(self._shutdown_now)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 20, 24, 20)
@@ -830,7 +1419,7 @@ class MainWindow(QWidget):
 
         
         footer2 = QLabel("Discord: devsoldmecrack")
-        footer2.setStyleSheet("color: gray;")
+        footer2.setObjectName("footer")
         layout.addWidget(footer2, alignment=Qt.AlignHCenter)
         layout.addSpacing(10)
 
@@ -841,14 +1430,15 @@ class MainWindow(QWidget):
 
         help = QLabel("❓")
         help.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
-        help.setStyleSheet(f"color: {HELP_GRAY};")
+        help.setObjectName("helpLabel")
+        help.setAttribute(Qt.WA_Hover, True)
         help.setAlignment(Qt.AlignLeft)
         help.setToolTip("Help")
         self._help_label = help
         help.installEventFilter(self)
 
         footer1 = QLabel("© Devsoldmecrack Inc. – All rights reserved.")
-        footer1.setStyleSheet("color: gray;")
+        footer1.setObjectName("footer")
 
         bottom_bar.addWidget(help, 0, Qt.AlignLeft | Qt.AlignVCenter)
         bottom_bar.addStretch(1)
@@ -856,14 +1446,15 @@ class MainWindow(QWidget):
         layout.addLayout(bottom_bar)
 
 
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        if PROFILE_STARTUP:
+            startup_mark("first paint (main window)")
+            QTimer.singleShot(0, report_startup_profile)
+
     def eventFilter(self, obj, event):
         if getattr(self, "_help_label", None) is obj:
-            et = event.type()
-            if et == QEvent.Enter:
-                self._help_label.setStyleSheet(f"color: {HELP_GRAY_HOVER};")
-            elif et == QEvent.Leave:
-                self._help_label.setStyleSheet(f"color: {HELP_GRAY};")
-            elif et == QEvent.MouseButtonRelease:
+            if event.type() == QEvent.MouseButtonRelease:
                 QMessageBox.information(
                     self,
                     "Help",
@@ -873,9 +1464,53 @@ class MainWindow(QWidget):
                 )
         return super().eventFilter(obj, event)
 
+    def _on_service_failed(self, message: str):
+        # Background services (metrics, control API) have no console of their
+        # own; stderr is invisible in a Windows GUI session, so show it too.
+        print(message, file=sys.stderr, flush=True)
+        QTimer.singleShot(0, lambda: QMessageBox.warning(self, "Warning", message))
+
+    def closeEvent(self, event):
+        # Closing the main window stops every bot (terminate, then kill after
+        # the grace period) before the application quits.
+        if self._shutdown is not None and self._shutdown.is_done():
+            event.accept()
+            return
+        event.ignore()
+        if self._shutdown is not None:
+            return
+        if getattr(self, "_orchestrator", None) is not None:
+            self._orchestrator.cancel()
+        self._shutdown = ShutdownCoordinator(self.supervisor, parent=self)
+        self._shutdown.progress.connect(
+            lambda n: self.setWindowTitle(f"Discord Bot Manager (Beta) – stopping {n} bot(s)…"))
+        self._shutdown.finished.connect(QApplication.instance().quit)
+        self._shutdown.start()
+
+    def _shutdown_now(self):
+        if self._shutdown is None:
+            self._shutdown = ShutdownCoordinator(self.supervisor, parent=self)
+        if not self._shutdown.is_done():
+            self._shutdown.run_blocking()
+
+    def autostart(self):
+        if SETTINGS.get("auto_start_app", False):
+            self.open_bot_manager()
+        if not SETTINGS.get("auto_start_bots", False):
+            return
+        paths = [p for p in state_store().bot_files() if os.path.exists(p)]
+        if not paths:
+            return
+        self._orchestrator = StartupOrchestrator.from_settings(self.supervisor, paths, SETTINGS, parent=self)
+        self._orchestrator.done.connect(lambda: setattr(self, "_orchestrator", None))
+        self._orchestrator.start()
+
     def open_bot_manager(self):
-        self._bot_window = BotManagerWindow()
+        if getattr(self, "_bot_window", None) is None:
+            self._bot_window = BotManagerWindow(self.supervisor, self.sampler)
         self._bot_window.show()
+        self._bot_window.raise_()
+        self._bot_window.activateWindow()
 
     def open_settings(self):
         dlg = SettingsWindow(self)
@@ -883,38 +1518,74 @@ class MainWindow(QWidget):
         dlg.exec()
 
 
+class BotLimitsDialog(QDialog):
+    # Edits the "limits" section of a bot's manifest; empty fields mean no limit.
+    def __init__(self, supervisor: BotSupervisor, path: str, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Limits – {bot_name(path)}")
+        self.setMinimumWidth(380)
+        self._supervisor = supervisor
+        self._path = path
+        limits = supervisor.manifest(path).limits
+
+        v = QVBoxLayout(self)
+        self._fields: dict[str, QLineEdit] = {}
+        for key, label, hint in [
+            ("max_rss_mb", "Max RAM (MB)", "e.g. 512"),
+            ("nice", "CPU niceness", "0 … 19"),
+            ("cpu_affinity", "CPU cores", "e.g. 0,1"),
+            ("nofile", "Max open files", "e.g. 1024"),
+        ]:
+            v.addWidget(QLabel(label))
+            edit = QLineEdit()
+            edit.setPlaceholderText(hint)
+            value = limits.get(key)
+            if isinstance(value, list):
+                value = ",".join(str(c) for c in value)
+            edit.setText("" if value is None else str(value))
+            self._fields[key] = edit
+            v.addWidget(edit)
+        self.chk_kill = QCheckBox("Kill instead of restart when the RAM limit is exceeded")
+        self.chk_kill.setChecked(limits.get("on_exceed") == "kill")
+        v.addWidget(self.chk_kill)
+        if not sys.platform.startswith("linux"):
+            v.addWidget(QLabel("Niceness, CPU cores and open files are only applied on Linux."))
+
+        save_btn = PillButton("💾 Save")
+        save_btn.clicked.connect(self.save)
+        v.addWidget(save_btn)
+
+    def save(self):
+        limits = {}
+        try:
+            for key, edit in self._fields.items():
+                text = edit.text().strip()
+                if not text:
+                    continue
+                if key == "cpu_affinity":
+                    limits[key] = [int(c) for c in text.replace(" ", "").split(",") if c]
+                elif key == "max_rss_mb":
+                    limits[key] = float(text)
+                else:
+                    limits[key] = int(text)
+        except ValueError:
+            QMessageBox.warning(self, "Invalid value", "Limits must be numbers (CPU cores as a comma-separated list).")
+            return
+        if limits and self.chk_kill.isChecked():
+            limits["on_exceed"] = "kill"
+        manifest = self._supervisor.manifest(self._path)
+        manifest.limits = limits
+        if not manifest.save():
+            QMessageBox.critical(self, "Error", f"Could not write {BotManifest.path_for(manifest.folder)}.")
+            return
+        self.accept()
+
+
 class SettingsWindow(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Settings")
         self.setMinimumSize(520, 520)
-        self.setStyleSheet(
-            f"""
-            QWidget {{
-                background-color: {COLOR_BG};
-                color: {COLOR_FG};
-            }}
-            QCheckBox::indicator {{
-                width: 18px;
-                height: 18px;
-                border-radius: 4px;
-                border: 1px solid #50579E;
-                background: transparent;
-                margin-right: 6px;
-            }}
-            QCheckBox::indicator:hover {{
-                border-color: #6b73c6;
-            }}
-            QCheckBox::indicator:checked {{
-                background: {COLOR_BTN_HOVER};
-                border-color: {COLOR_BTN_HOVER};
-            }}
-            QCheckBox::indicator:disabled {{
-                background: transparent;
-                border-color: #2c2f4a;
-            }}
-            """
-        )
 
         v = QVBoxLayout(self)
         v.setContentsMargins(16, 16, 16, 16)
@@ -925,12 +1596,16 @@ class SettingsWindow(QDialog):
         v.addWidget(title)
 
         
-        self.chk_auto_start_app = QCheckBox("Automatically start Bot Manager")
-        self.chk_auto_start_bots = QCheckBox("Auto-open first bot on launch")
+        self.chk_auto_start_app = QCheckBox("Open Bot Manager window on launch")
+        self.chk_auto_start_bots = QCheckBox("Auto-start all bots on launch")
         self.chk_notifications = QCheckBox("Notifications on crash/connectivity loss")
         self.chk_cleanup = QCheckBox("Delete temp folder on close")
         self.chk_start_with_windows = QCheckBox("Start with Windows")
         self.chk_auto_restart = QCheckBox("Auto-restart bots on crash")
+        self.chk_hot_reload = QCheckBox("Hot-reload bots when their source changes")
+        self.chk_isolated_venvs = QCheckBox("Isolated virtualenv per bot (shared wheel cache)")
+        self.chk_light_theme = QCheckBox("Light theme")
+        self.chk_metrics = QCheckBox(f"OpenMetrics endpoint on http://127.0.0.1:{SETTINGS.get('metrics_port', 9464)}/metrics")
 
         for cb, key in [
             (self.chk_auto_start_app, "auto_start_app"),
@@ -939,14 +1614,19 @@ class SettingsWindow(QDialog):
             (self.chk_cleanup, "cleanup_temp_on_close"),
             (self.chk_start_with_windows, "start_with_windows"),
             (self.chk_auto_restart, "auto_restart"),
+            (self.chk_hot_reload, "hot_reload"),
+            (self.chk_isolated_venvs, "isolated_venvs"),
+            (self.chk_metrics, "metrics_enabled"),
         ]:
             cb.setChecked(SETTINGS.get(key, False))
             v.addWidget(cb)
+        self.chk_light_theme.setChecked(SETTINGS.get("theme") == "light")
+        v.addWidget(self.chk_light_theme)
 
         
         v.addWidget(QLabel("Environment variables (global, optional):"))
         self.env_edit = QTextEdit()
-        self.env_edit.setStyleSheet(f"background-color: {COLOR_BTN_BG}; color: white;")
+        self.env_edit.setObjectName("envEdit")
         env_text = "\n".join(f"{k}={v}" for k, v in SETTINGS.get("env_vars", {}).items())
         self.env_edit.setPlainText(env_text)
         self.env_edit.setFixedHeight(160)
@@ -959,6 +1639,8 @@ class SettingsWindow(QDialog):
         self.env_bot_combo = QListWidget()
         self.env_bot_combo.setFixedHeight(100)
         self._populate_env_bot_combo()
+        self.env_bot_combo.itemSelectionChanged.connect(self._on_env_bot_select)
+        state_store().changed.connect(self._on_state_changed)
         bot_sel_row.addWidget(self.env_bot_combo)
         v.addLayout(bot_sel_row)
 
@@ -1002,6 +1684,11 @@ class SettingsWindow(QDialog):
         SETTINGS["cleanup_temp_on_close"] = self.chk_cleanup.isChecked()
         SETTINGS["start_with_windows"] = self.chk_start_with_windows.isChecked()
         SETTINGS["auto_restart"] = self.chk_auto_restart.isChecked()
+        SETTINGS["hot_reload"] = self.chk_hot_reload.isChecked()
+        SETTINGS["isolated_venvs"] = self.chk_isolated_venvs.isChecked()
+        SETTINGS["metrics_enabled"] = self.chk_metrics.isChecked()
+        SETTINGS["theme"] = "light" if self.chk_light_theme.isChecked() else "dark"
+        apply_theme(QApplication.instance(), SETTINGS["theme"])
 
         env_dict = {}
         for line in self.env_edit.toPlainText().splitlines():
@@ -1010,7 +1697,7 @@ class SettingsWindow(QDialog):
                 env_dict[k.strip()] = v.strip()
         SETTINGS["env_vars"] = env_dict
 
-        save_settings(SETTINGS)
+        save_settings()
         add_to_registry_autostart()
         QMessageBox.information(self, "Saved", "Settings updated.")
 
@@ -1026,17 +1713,12 @@ class SettingsWindow(QDialog):
 
     def _populate_env_bot_combo(self):
         self.env_bot_combo.clear()
-        paths = []
-        try:
-            if os.path.exists(BOT_DATA_FILE):
-                with open(BOT_DATA_FILE, "r", encoding="utf-8") as f:
-                    paths = json.load(f).get("bot_files", [])
-        except Exception:
-            paths = []
-        for p in paths:
+        for p in state_store().bot_files():
             self.env_bot_combo.addItem(p)
-        
-        self.env_bot_combo.itemSelectionChanged.connect(self._on_env_bot_select)
+
+    def _on_state_changed(self, name: str):
+        if name == "bots":
+            self._populate_env_bot_combo()
 
     def _on_env_bot_select(self):
         items = self.env_bot_combo.selectedItems()
@@ -1084,8 +1766,7 @@ class SettingsWindow(QDialog):
             lines.append(f"DISCORD_TOKEN={token}")
         
         try:
-            with open(env_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(lines) + "\n")
+            atomic_write_text(env_path, "\n".join(lines) + "\n")
             QMessageBox.information(self, "Gespeichert", f"Token in {env_path} aktualisiert.")
         except Exception as e:
             QMessageBox.critical(self, "Fehler", f".env konnte nicht geschrieben werden:\n{e}")
@@ -1093,6 +1774,9 @@ class SettingsWindow(QDialog):
 
 def main():
     app = QApplication(sys.argv)
+    apply_theme(app, SETTINGS.get("theme"))
+    startup_mark("QApplication")
+    app.aboutToQuit.connect(report_startup_profile)
     
     if os.name == "nt":
         try:
@@ -1111,35 +1795,19 @@ def main():
             app.setWindowIcon(gen_icon)
         except Exception:
             pass
+    startup_mark("window icon")
 
     class AnimatedSplash(QWidget):
         def __init__(self):
             super().__init__(None, Qt.FramelessWindowHint | Qt.SplashScreen)
             self.setAttribute(Qt.WA_TranslucentBackground)
+            self.setObjectName("splash")
             if app.windowIcon().isNull() is False:
                 self.setWindowIcon(app.windowIcon())
 
             
             card = QWidget(self)
             card.setObjectName("card")
-            card.setStyleSheet(
-                f"""
-                QWidget#card {{
-                    background-color: {COLOR_BG};
-                    border-radius: 16px;
-                }}
-                QProgressBar {{
-                    background: #222641;
-                    border: 1px solid #3d4170;
-                    border-radius: 8px;
-                    color: white;
-                }}
-                QProgressBar::chunk {{
-                    background-color: {COLOR_BTN_HOVER};
-                    border-radius: 8px;
-                }}
-                """
-            )
 
             v = QVBoxLayout(card)
             v.setContentsMargins(24, 24, 24, 24)
@@ -1147,12 +1815,12 @@ def main():
 
             title = QLabel("Discord Bot Manager")
             title.setFont(QFont("Segoe UI", 18, QFont.Weight.Bold))
-            title.setStyleSheet("color: white;")
+            title.setObjectName("splashTitle")
             title.setAlignment(Qt.AlignHCenter)
             v.addWidget(title)
 
             subtitle = QLabel("Loading…")
-            subtitle.setStyleSheet("color: #bfc3ff;")
+            subtitle.setObjectName("splashSubtitle")
             subtitle.setAlignment(Qt.AlignHCenter)
             v.addWidget(subtitle)
 
@@ -1176,6 +1844,10 @@ def main():
             self._eff.setOpacity(0.0)
             self.setGraphicsEffect(self._eff)
 
+        def paintEvent(self, e):
+            super().paintEvent(e)
+            startup_mark("first paint (splash)")
+
         def run_then(self, callback):
             self.show()
 
@@ -1220,7 +1892,7 @@ def main():
 
             self.banner = QLabel("")
             self.banner.setVisible(False)
-            self.banner.setStyleSheet("background:#3a1b1e; color:#ffb3b3; border:1px solid #7a2b32; border-radius:8px; padding:8px;")
+            self.banner.setObjectName("errorBanner")
             lay.addWidget(self.banner)
 
             self.info = QLabel("Your default browser will open. After logging in, you'll return automatically.")
@@ -1233,6 +1905,10 @@ def main():
 
             self._server = None
             self._server_thread = None
+            self._bridge = OAuthCallbackBridge(self)
+            self._bridge.code_received.connect(self._on_code)
+            self._bridge.callback_error.connect(self._on_callback_error)
+            self._worker = None
             self._port = 53135
             self._token = None
             self._code = None
@@ -1240,6 +1916,10 @@ def main():
             
             self.adjustSize()
 
+        def showEvent(self, e):
+            super().showEvent(e)
+            startup_mark("login dialog shown")
+
         def _show_error(self, msg: str):
             self.banner.setText("⚠ " + msg)
             self.banner.setVisible(True)
@@ -1248,8 +1928,13 @@ def main():
             self.banner.setGraphicsEffect(eff)
 
         def _start_http(self):
+            from http.server import HTTPServer, BaseHTTPRequestHandler
+
+            if self._server:
+                return True
+
             class Handler(BaseHTTPRequestHandler):
-                outer = self
+                bridge = self._bridge
                 def log_message(self, format, *args):
                     return
                 def do_GET(self):
@@ -1258,15 +1943,17 @@ def main():
                         q = urlparse(self.path).query
                         params = parse_qs(q)
                         code_vals = params.get('code')
-                        outer = self.__class__.outer
+                        bridge = self.__class__.bridge
                         if code_vals and code_vals[0]:
-                            outer._code = code_vals[0]
+                            bridge.code_received.emit(code_vals[0])
                             msg = "<html><body>Login processed. You can close this window.</body></html>"
                             self.send_response(200)
                             self.send_header('Content-Type','text/html')
                             self.end_headers()
                             self.wfile.write(msg.encode('utf-8'))
                         else:
+                            err = (params.get('error_description') or params.get('error') or ["no code"])[0]
+                            bridge.callback_error.emit(err)
                             self.send_response(400); self.end_headers()
                     else:
                         self.send_response(404); self.end_headers()
@@ -1291,12 +1978,13 @@ def main():
             return True
 
         def start_login(self):
+            requests = optional_import("requests")
             if requests is None:
                 self._show_error("Python package 'requests' is missing. Please run: pip install requests")
                 return
             if not self._start_http():
                 return
-            client_id = "1429597807161114624"
+            client_id = OAUTH_CLIENT_ID
             redirect = f"http://127.0.0.1:{self._port}/callback"
             scope = "identify"
             
@@ -1316,6 +2004,7 @@ def main():
             })
             auth_url = f"https://discord.com/oauth2/authorize?{qs}"
             try:
+                import webbrowser
                 webbrowser.open(auth_url)
             except Exception:
                 self._show_error("Could not open the browser. Open this URL manually: " + auth_url)
@@ -1329,67 +2018,87 @@ def main():
             self._auth_link.setText(f"<a href='{auth_url}'>If your browser didn't open, click here to sign in with Discord.</a>")
 
             
-            self._poll_timer = QTimer(self)
-            self._poll_timer.setInterval(200)
-            self._poll_timer.timeout.connect(self._check_token)
-            self._poll_timer.start()
+            self._code = None
             self._deadline = QTimer(self)
             self._deadline.setSingleShot(True)
             self._deadline.setInterval(60000)  
             self._deadline.timeout.connect(lambda: self._show_error("Timeout: No code received. Check redirect URLs (53135/53136) and Public Client in the Developer Portal."))
             self._deadline.start()
 
-        def _check_token(self):
-            
-            if not self._code:
+        def _on_code(self, code: str):
+            if self._code:
                 return
-            self._poll_timer.stop()
+            self._code = code
             if hasattr(self, "_deadline"):
                 self._deadline.stop()
-            
-            try:
-                if self._server:
-                    self._server.shutdown()
-            except Exception:
-                pass
-        
-            try:
-                data = {
-                    "client_id": "1429597807161114624",
-                    "grant_type": "authorization_code",
-                    "code": self._code,
-                    "redirect_uri": f"http://127.0.0.1:{self._port}/callback",
-                    "code_verifier": self._code_verifier,
-                }
-                token_resp = requests.post("https://discord.com/api/oauth2/token", data=data, timeout=8)
-                if token_resp.status_code != 200:
-                    self._show_error(f"Token exchange failed: HTTP {token_resp.status_code} {token_resp.text[:120]}")
-                    return
-                token_json = token_resp.json()
-                self._token = token_json.get("access_token")
-                if not self._token:
-                    self._show_error("No access_token in token response.")
-                    return
-                
-                resp = requests.get("https://discord.com/api/users/@me", headers={"Authorization": f"Bearer {self._token}"}, timeout=5)
-                if resp.status_code != 200:
-                    self._show_error(f"Login failed: HTTP {resp.status_code}")
-                    return
-                app.discord_token = self._token
-                app.discord_user = resp.json()
-                self.accept()
-            except Exception as e:
-                self._show_error(f"Network error: {e}")
+            self._stop_http()
+            self._worker = OAuthExchangeWorker(
+                DiscordOAuth(),
+                code,
+                self._code_verifier,
+                f"http://127.0.0.1:{self._port}/callback",
+                parent=self,
+            )
+            self._worker.succeeded.connect(self._on_login_succeeded)
+            self._worker.failed.connect(self._on_login_failed)
+            self._worker.start()
+
+        def _on_callback_error(self, msg: str):
+            if hasattr(self, "_deadline"):
+                self._deadline.stop()
+            self._stop_http()
+            self._show_error(f"Discord returned an error: {msg}")
+
+        def _on_login_succeeded(self, token_json: dict, user: dict):
+            self._token = token_json.get("access_token")
+            app.discord_token = self._token
+            app.discord_user = user
+            CredentialCache().save(token_json, user)
+            self.accept()
+
+        def _on_login_failed(self, msg: str):
+            self._code = None
+            self._show_error(msg)
+
+        def _stop_http(self):
+            srv, self._server = self._server, None
+            if srv is None:
+                return
+
+            def shutdown():
+                try:
+                    srv.shutdown()
+                    srv.server_close()
+                except Exception:
+                    pass
+            # shutdown() waits for serve_forever's poll loop; keep that off the GUI thread.
+            threading.Thread(target=shutdown, daemon=True).start()
+
+        def reject(self):
+            self._stop_http()
+            super().reject()
 
     
+    # Validate (and if needed refresh) the cached Discord session while the
+    # splash is playing, so a warm start can skip the login dialog.
+    session_check = CachedSessionWorker(parent=app)
+    session_check.start()
+
     splash = AnimatedSplash()
     def show_login_then_main():
-        dlg = LoginDialog()
-        if dlg.exec() == QDialog.Accepted:
+        if not session_check.done:
+            session_check.finished.connect(lambda _: show_login_then_main())
+            return
+        session = session_check.result
+        if session:
+            app.discord_token = session.get("access_token")
+            app.discord_user = session.get("user")
+        if session or LoginDialog().exec() == QDialog.Accepted:
             app.main_window = MainWindow()
             if app.windowIcon().isNull() is False:
                 app.main_window.setWindowIcon(app.windowIcon())
             app.main_window.show()
+            app.main_window.autostart()
         else:
             
             app.quit()